@@ -0,0 +1,482 @@
+"""
+Offline end-to-end benchmark for the AURA pipeline
+(ExtractAgent -> ScoutAgent -> VerifyAgent -> MemoryAgent).
+
+Gemini, grounded search, Maps and OpenWeather are replaced by local stand-ins with
+configurable latency and error injection (including 429s that go through
+handle_rate_limit), so throughput and per-stage latency can be measured without
+any API keys.
+
+Usage:
+    python benchmarks/pipeline_bench.py --items 1000 --workers 4
+    python benchmarks/pipeline_bench.py --items 100000 --llm-latency 0 --json bench.json
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# Add repo root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agents.extract_agent import ExtractAgent
+from src.agents.verify_agent import VerifyAgent
+from src.agents.memory_agent import MemoryAgent
+from src.agents.scout_agent import ScoutAgent
+from src.pipeline import Pipeline
+from src.triage import TriageFilter
+from src.dedup import NearDuplicateDetector
+from src.utils.llm_cache import llm_cache
+from src.utils.rate_limiter import handle_rate_limit, limiter
+import src.agents.extract_agent as extract_module
+
+CITIES = {
+    "Tokyo": (35.6762, 139.6503),
+    "Mumbai": (19.0760, 72.8777),
+    "Miami Beach": (25.7906, -80.1300),
+    "Grindavik": (63.8424, -22.4338),
+    "Cusco": (-13.5319, -71.9675),
+    "Valparaiso": (-33.0472, -71.6127),
+    "Munich": (48.1351, 11.5820),
+    "Cox's Bazar": (21.4272, 92.0058),
+    "Katoomba": (-33.7125, 150.3119),
+    "Lodwar": (3.1167, 35.6000),
+}
+INCIDENT_TYPES = ["Fire", "Flood", "Earthquake", "Landslide", "Storm"]
+SEVERITIES = ["Low", "Medium", "High", "Critical"]
+TEMPLATES = [
+    "BREAKING: {severity_word} {type} reported near {district}, {city}. Crews on scene.",
+    "Can see the {type_lower} from my window in {district}, {city}! #emergency",
+    "OFFICIAL ALERT: {type} warning issued for {district} ({city}). Residents advised to stay alert.",
+    "Locals say the {type_lower} in {district}, {city} is getting worse by the minute.",
+]
+SEVERITY_WORDS = {"Low": "minor", "Medium": "moderate", "High": "major", "Critical": "massive"}
+
+# --- Synthetic corpus ---
+
+REPOST_FORMATS = ("RT @{user}: {text}", "{text} https://t.co/{user}", "BREAKING: {text}", "{text} #{user}")
+
+def generate_corpus(n, seed=42, districts_per_city=20, repost_rate=0.0):
+    """
+    Generates n synthetic reports spread over a fixed set of cities and districts.
+    With repost_rate, that share of items are retweets/reposts of an earlier item.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        if corpus and rng.random() < repost_rate:
+            original = rng.choice(corpus[-50:])
+            text = rng.choice(REPOST_FORMATS).format(text=original["text"], user=f"user{rng.randrange(1000)}")
+            corpus.append({"text": text, "source": rng.choice(["twitter", "reddit"])})
+            continue
+        city = rng.choice(list(CITIES))
+        incident_type = rng.choice(INCIDENT_TYPES)
+        severity = rng.choice(SEVERITIES)
+        district = f"District {rng.randrange(districts_per_city)}"
+        text = rng.choice(TEMPLATES).format(
+            severity_word=SEVERITY_WORDS[severity], type=incident_type, type_lower=incident_type.lower(),
+            district=district, city=city
+        )
+        corpus.append({"text": text, "source": rng.choice(["twitter", "news_report", "reddit"])})
+    return corpus
+
+# --- Stand-ins ---
+
+class FaultInjector:
+    """Shared latency and error injection for all stand-ins."""
+    def __init__(self, error_rate=0.0, rate_limit_rate=0.0, retry_after=0.0, seed=7):
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.injected = defaultdict(int)
+
+    def sleep(self, mean):
+        if mean > 0:
+            with self.lock:
+                delay = self.rng.expovariate(1.0 / mean)
+            time.sleep(delay)
+
+    def maybe_fail(self, dependency):
+        with self.lock:
+            roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            with self.lock:
+                self.injected[f"{dependency}_429"] += 1
+            raise Exception(f"429 Resource has been exhausted (e.g. check quota). Please retry in {self.retry_after}s.")
+        if roll < self.rate_limit_rate + self.error_rate:
+            with self.lock:
+                self.injected[f"{dependency}_error"] += 1
+            raise Exception("500 Internal error encountered.")
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeGeminiModel:
+    """
+    Answers the AURA prompts (extract, scout, verify, similarity) deterministically from
+    the prompt text, after a simulated network delay.
+    """
+    model_name = "models/fake-gemini"
+
+    def __init__(self, faults, latency):
+        self.faults = faults
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.calls = defaultdict(int)
+
+    def _count(self, kind):
+        with self.lock:
+            self.calls[kind] += 1
+
+    def generate_content(self, prompt):
+        self.faults.sleep(self.latency)
+        self.faults.maybe_fail("gemini")
+
+        if "Posts (one per line" in prompt:
+            self._count("extract_batch")
+            items = []
+            for i, post in re.findall(r'^\[(\d+)\] (.*)$', prompt, re.M):
+                data = self._extract(json.loads(post))
+                data["id"] = int(i)
+                items.append(data)
+            return FakeResponse(json.dumps(items))
+        if "plan how to corroborate it" in prompt:
+            self._count("extract_fused")
+            post = re.search(r'Post: "(.*)"\n\nReturn ONLY', prompt, re.S).group(1)
+            data = self._extract(post)
+            context = f"{data['incident_type']} in {data['location_text']}"
+            data["search_queries"] = [
+                f"site:twitter.com {context} latest", f"site:reddit.com {context}", f"{context} live updates"
+            ]
+            return FakeResponse(json.dumps(data))
+        if "Analyze the following social media post" in prompt:
+            self._count("extract")
+            post = re.search(r'Post: "(.*)"\n\nReturn ONLY', prompt, re.S).group(1)
+            return FakeResponse(json.dumps(self._extract(post)))
+        if "Scout Agent" in prompt:
+            self._count("scout")
+            context = re.search(r'Context: "(.*?)"', prompt).group(1)
+            return FakeResponse(json.dumps([
+                f"site:twitter.com {context} latest", f"site:reddit.com {context}", f"{context} live updates"
+            ]))
+        if "Fact-Checking Analyst" in prompt:
+            self._count("verify")
+            score = 85 if "alert" in prompt.lower() or "crews" in prompt.lower() else 72
+            return FakeResponse(json.dumps({
+                "credibility_score": score, "verification_notes": "Synthetic corroboration.", "is_verified": score >= 70
+            }))
+        if "same specific event" in prompt:
+            self._count("similarity")
+            districts = re.findall(r"District \d+", prompt)
+            return FakeResponse("YES" if len(districts) >= 2 and districts[0] == districts[1] else "NO")
+        self._count("other")
+        return FakeResponse("{}")
+
+    @staticmethod
+    def _extract(post):
+        city = next((c for c in CITIES if c in post), "Unknown")
+        incident_type = next((t for t in INCIDENT_TYPES if t.lower() in post.lower()), "Hazard")
+        severity = next((s for s, w in SEVERITY_WORDS.items() if w in post), "High")
+        district = re.search(r"District \d+", post)
+        location = f"{district.group(0)}, {city}" if district else city
+        return {
+            "location_text": location, "incident_type": incident_type, "severity": severity,
+            "summary": post, "confidence": 0.9
+        }
+
+class FakeGeocoder:
+    """Resolves "District N, City" to a point a few hundred meters apart per district."""
+    def __init__(self, faults, latency):
+        self.faults = faults
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, address, mock_mode=False):
+        with self.lock:
+            self.calls += 1
+        self.faults.sleep(self.latency)
+        city = next((c for c in CITIES if c in address), None)
+        if not city:
+            return None
+        lat, lon = CITIES[city]
+        district = re.search(r"District (\d+)", address)
+        offset = int(district.group(1)) * 0.004 if district else 0.0
+        return lat + offset, lon
+
+class FakeWeatherTool:
+    api_key = "fake"
+
+    def __init__(self, faults, latency):
+        self.faults = faults
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def fetch_weather(self, lat, lon):
+        with self.lock:
+            self.calls += 1
+        self.faults.sleep(self.latency)
+        return {"description": "light rain", "temperature": "21°C", "humidity": "80%", "wind_speed": "4 m/s", "alerts": []}
+
+class FakeSearch:
+    """Stands in for ScoutAgent._run_query's live path (grounded search / Reddit)."""
+    def __init__(self, faults, latency):
+        self.faults = faults
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, query, mock_mode, reddit_tool, genai_search_available):
+        for attempt in range(3):
+            with self.lock:
+                self.calls += 1
+            try:
+                self.faults.sleep(self.latency)
+                self.faults.maybe_fail("search")
+                return [{
+                    "source": "Google Search (Synthetic)",
+                    "citations": [{"title": "Synthetic News", "url": f"https://example.com/{abs(hash(query)) % 10000}"}],
+                    "query": query,
+                    "content": f"Live coverage confirms: {query}",
+                    "timestamp": "Just now"
+                }]
+            except Exception as e:
+                if handle_rate_limit(e):
+                    continue
+                return [{"source": "System", "query": query, "content": f"Failed to search: {e}", "timestamp": "Just now"}]
+        return []
+
+# --- Instrumentation ---
+
+class StageTimer:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.lock = threading.Lock()
+
+    def wrap(self, stage, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self.lock:
+                    self.samples[stage].append(elapsed)
+        return timed
+
+    def summary(self):
+        result = {}
+        with self.lock:
+            for stage, values in self.samples.items():
+                ordered = sorted(values)
+                result[stage] = {
+                    "count": len(ordered),
+                    "p50_ms": percentile(ordered, 50) * 1000,
+                    "p95_ms": percentile(ordered, 95) * 1000,
+                    "p99_ms": percentile(ordered, 99) * 1000,
+                    "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+                }
+        return result
+
+def percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100.0
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+def count_rate_limit_sleeps():
+    """Counts handle_rate_limit sleeps by wrapping time.sleep in the rate limiter module."""
+    import src.utils.rate_limiter as rate_limiter
+    counter = {"sleeps": 0, "seconds": 0.0}
+    lock = threading.Lock()
+    original_sleep = rate_limiter.time.sleep
+
+    class _TimeProxy:
+        def __getattr__(self, name):
+            return getattr(time, name)
+
+        @staticmethod
+        def sleep(seconds):
+            with lock:
+                counter["sleeps"] += 1
+                counter["seconds"] += seconds
+            original_sleep(seconds)
+
+    rate_limiter.time = _TimeProxy()
+    return counter
+
+# --- Harness ---
+
+def build_pipeline(args, faults, timer):
+    extract_agent = ExtractAgent()
+    scout_agent = ScoutAgent()
+    verify_agent = VerifyAgent()
+    memory_agent = MemoryAgent()
+
+    model = FakeGeminiModel(faults, args.llm_latency)
+    extract_agent.model = model
+    scout_agent.model = model
+    verify_agent.model = model
+    memory_agent.model = model
+
+    geocoder = FakeGeocoder(faults, args.maps_latency)
+    extract_module.get_coordinates = geocoder
+    weather = FakeWeatherTool(faults, args.weather_latency)
+    verify_agent.weather_tool = weather
+    search = FakeSearch(faults, args.search_latency)
+    scout_agent._run_query = search
+
+    extract_agent.extract = timer.wrap("extract", extract_agent.extract)
+    extract_agent.extract_with_strategy = timer.wrap("extract", extract_agent.extract_with_strategy)
+    extract_agent.locate = timer.wrap("geocode", extract_agent.locate)
+    verify_agent.weather_context = timer.wrap("weather", verify_agent.weather_context)
+    scout_agent.generate_strategy = timer.wrap("scout_strategy", scout_agent.generate_strategy)
+    scout_agent.fetch_updates = timer.wrap("scout_search", scout_agent.fetch_updates)
+    verify_agent.verify = timer.wrap("verify", verify_agent.verify)
+    memory_agent.consolidate = timer.wrap("consolidate", memory_agent.consolidate)
+
+    triage = TriageFilter() if args.triage else None
+    dedup = NearDuplicateDetector() if args.dedup else None
+    pipeline = Pipeline(
+        extract_agent, scout_agent, verify_agent, memory_agent,
+        triage=triage, dedup=dedup, fused_strategy=args.fused, stage_workers=args.stage_workers
+    )
+    stubs = {"model": model, "geocoder": geocoder, "weather": weather, "search": search}
+    return pipeline, stubs
+
+def memory_snapshot(memory_agent, processed):
+    incidents = memory_agent.get_all_incidents()
+    return {
+        "processed": processed,
+        "incidents": len(incidents),
+        "reports": sum(i["report_count"] for i in incidents),
+        "serialized_bytes": len(json.dumps(incidents, default=str)),
+    }
+
+def run(args):
+    llm_cache.enabled = args.llm_cache
+    limiter.enabled = args.rate_limiter
+    faults = FaultInjector(args.error_rate, args.rate_limit_rate, args.retry_after, seed=args.seed)
+    timer = StageTimer()
+    rate_limit_counter = count_rate_limit_sleeps()
+    pipeline, stubs = build_pipeline(args, faults, timer)
+    corpus = generate_corpus(args.items, seed=args.seed, districts_per_city=args.districts, repost_rate=args.repost_rate)
+
+    checkpoints = max(1, args.items // args.snapshots)
+    snapshots = []
+    outcomes = defaultdict(int)
+    progress = {"done": 0}
+    lock = threading.Lock()
+
+    def process(item):
+        result = timer.wrap("total", pipeline.process)(item["text"], item["source"], mock_mode=False)
+        with lock:
+            if result["duplicate_of"]:
+                outcomes["duplicate"] += 1
+            elif result["triage"] and result["triage"]["decision"] == "drop":
+                outcomes["dropped"] += 1
+            else:
+                outcomes["verified" if result["incident"] else "rejected"] += 1
+            progress["done"] += 1
+            if progress["done"] % checkpoints == 0:
+                snapshots.append(memory_snapshot(pipeline.memory_agent, progress["done"]))
+
+    start = time.perf_counter()
+    if args.workers <= 1:
+        for item in corpus:
+            process(item)
+    else:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            list(executor.map(process, corpus))
+    elapsed = time.perf_counter() - start
+
+    llm_calls = sum(stubs["model"].calls.values())
+    return {
+        "config": vars(args),
+        "elapsed_s": elapsed,
+        "items_per_s": args.items / elapsed if elapsed else 0.0,
+        "outcomes": dict(outcomes),
+        "stages": timer.summary(),
+        "calls": {
+            "llm_total": llm_calls,
+            "llm_per_item": llm_calls / args.items,
+            "llm_by_kind": dict(stubs["model"].calls),
+            "search": stubs["search"].calls,
+            "geocode": stubs["geocoder"].calls,
+            "weather": stubs["weather"].calls,
+        },
+        "llm_cache": llm_cache.stats(),
+        "triage": pipeline.triage.stats() if pipeline.triage else None,
+        "dedup": pipeline.dedup.stats() if pipeline.dedup else None,
+        "faults_injected": dict(faults.injected),
+        "rate_limit_sleeps": rate_limit_counter,
+        "memory": snapshots,
+    }
+
+def print_report(report):
+    print(f"\nItems: {report['config']['items']}  Workers: {report['config']['workers']}  "
+          f"Elapsed: {report['elapsed_s']:.2f}s  Throughput: {report['items_per_s']:.1f} items/s")
+    print(f"Outcomes: {report['outcomes']}")
+    print(f"\n{'stage':<16}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    order = ["extract", "geocode", "scout_strategy", "scout_search", "weather", "verify", "consolidate", "total"]
+    for stage in order:
+        s = report["stages"].get(stage)
+        if s:
+            print(f"{stage:<16}{s['count']:>8}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['max_ms']:>10.1f}")
+    calls = report["calls"]
+    print(f"\nLLM calls: {calls['llm_total']} ({calls['llm_per_item']:.2f}/item) {calls['llm_by_kind']}")
+    print(f"Search: {calls['search']}  Geocode: {calls['geocode']}  Weather: {calls['weather']}")
+    print(f"Faults injected: {report['faults_injected']}  Rate-limit sleeps: {report['rate_limit_sleeps']}")
+    if report["triage"]:
+        print(f"Triage: {report['triage']}")
+    if report["dedup"]:
+        print(f"Dedup: {report['dedup']}")
+    if report["memory"]:
+        print(f"\n{'processed':>10}{'incidents':>11}{'reports':>10}{'bytes':>14}")
+        for snap in report["memory"]:
+            print(f"{snap['processed']:>10}{snap['incidents']:>11}{snap['reports']:>10}{snap['serialized_bytes']:>14}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline AURA pipeline benchmark")
+    parser.add_argument("--items", type=int, default=1000, help="Synthetic reports to process")
+    parser.add_argument("--workers", type=int, default=1, help="Items processed concurrently")
+    parser.add_argument("--districts", type=int, default=20, help="Distinct districts per city (controls merge rate)")
+    parser.add_argument("--llm-latency", type=float, default=0.005, help="Mean Gemini latency (s)")
+    parser.add_argument("--search-latency", type=float, default=0.01, help="Mean grounded search latency (s)")
+    parser.add_argument("--maps-latency", type=float, default=0.002, help="Mean geocoding latency (s)")
+    parser.add_argument("--weather-latency", type=float, default=0.002, help="Mean weather latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 500 error per call")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of a 429 per call")
+    parser.add_argument("--retry-after", type=float, default=0.0, help="Retry delay advertised in injected 429s (s)")
+    parser.add_argument("--llm-cache", action="store_true", help="Keep the shared LLM response cache enabled")
+    parser.add_argument("--rate-limiter", action="store_true", help="Keep the shared rate limiter enabled (configured RPM/TPM)")
+    parser.add_argument("--repost-rate", type=float, default=0.0, help="Share of items that repost an earlier item")
+    parser.add_argument("--dedup", action="store_true", help="Attach near-duplicates before running the agents")
+    parser.add_argument("--fused", action="store_true", help="Extract and plan Scout queries in one LLM call")
+    parser.add_argument("--stage-workers", type=int, default=8, help="Threads for overlapping pipeline stages (0 = serial)")
+    parser.add_argument("--triage", action="store_true", help="Run the local triage filter ahead of extraction")
+    parser.add_argument("--snapshots", type=int, default=10, help="Memory growth samples over the run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Also write the full report to this file")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse, JSONResponse, Response, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
@@ -6,6 +7,8 @@ import uvicorn
 import time
 import os
 import sys
+import threading
+from collections import deque
 
 # Add src to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -15,7 +18,26 @@ from src.agents.verify_agent import VerifyAgent
 from src.agents.memory_agent import MemoryAgent
 from src.agents.scout_agent import ScoutAgent
 from src.tools.real_incident_feed import RealIncidentFeed
-from src.config import DEFAULT_MAP_CENTER
+from src.tools.replay_feed import ReplayFeed
+from src.tools.weather_tool import WeatherRefresher
+from src.pipeline import Pipeline
+from src.utils.dag_executor import RunCancelled
+from src.triage import TriageFilter
+from src.dedup import NearDuplicateDetector
+from src.ingestion import IngestionEngine
+from src.lifecycle import IncidentLifecycleManager
+from src.utils.llm_cache import llm_cache
+from src.utils.event_broker import EventBroker
+from src.utils.metrics import metrics
+from src.utils.rate_limiter import limiter
+from src.utils.http_client import close_session
+from src.tools.map_tools import geocode_cache
+from src.config import (
+    DEFAULT_MAP_CENTER, WEATHER_BACKGROUND_REFRESH, INGESTION_ENABLED, INGESTION_MOCK_MODE,
+    INGESTION_WORKERS, INGESTION_QUEUE_SIZE, INGESTION_POLL_INTERVAL,
+    REPLAY_FILES, REPLAY_RATE, REPLAY_SPEED, REPLAY_SHUFFLE, REPLAY_LOOP, REPLAY_SEED,
+    INCIDENT_LIFECYCLE_ENABLED, TRIAGE_ENABLED, DEDUP_ENABLED, EXTRACT_FUSED_STRATEGY
+)
 
 app = FastAPI(title="AURA API")
 
@@ -27,6 +49,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Push channel for dashboards (process-wide, so subscribers survive /reset)
+events = EventBroker()
+
+def incident_event_payload(incident):
+    """Incident snapshot for streaming: everything except the reports list."""
+    return incident.to_dict()
+
 # State
 class SystemState:
     def __init__(self):
@@ -34,147 +63,341 @@ class SystemState:
         self.verify_agent = VerifyAgent()
         self.memory_agent = MemoryAgent()
         self.scout_agent = ScoutAgent()
-        self.real_feed = RealIncidentFeed()
+        # Each refresh's headlines are extracted and geocoded in one batch
+        self.real_feed = RealIncidentFeed(extractor=self.extract_agent.extract_batch)
+        # Mock mode corpus, parsed once and replayed at REPLAY_RATE
+        self.mock_feed = ReplayFeed(
+            REPLAY_FILES,
+            rate=REPLAY_RATE,
+            speed=REPLAY_SPEED,
+            shuffle=REPLAY_SHUFFLE,
+            loop=REPLAY_LOOP,
+            seed=REPLAY_SEED
+        )
+        self.memory_agent.add_listener(
+            lambda action, incident: events.publish(action, incident_event_payload(incident))
+        )
+        # Local pre-filter: drops noise before any LLM call, fast-tracks official alerts
+        self.triage = TriageFilter() if TRIAGE_ENABLED else None
+        # Reposts of an item that already produced an incident skip the agents
+        self.dedup = NearDuplicateDetector() if DEDUP_ENABLED else None
+        self.pipeline = Pipeline(
+            self.extract_agent, self.scout_agent, self.verify_agent, self.memory_agent,
+            triage=self.triage, dedup=self.dedup, fused_strategy=EXTRACT_FUSED_STRATEGY
+        )
         self.processed_count = 0
         self.last_activity = time.time()
-        self.logs = []
+        self.logs = deque(maxlen=500)
+        # Guards the feed cursor and counters shared by /simulate and the ingestion workers
+        self.lock = threading.Lock()
+        
+        # Keep weather warm for every known incident so verification doesn't wait on the API
+        self.weather_refresher = WeatherRefresher(
+            self.verify_agent.weather_tool,
+            lambda: [incident.coordinates for incident in self.memory_agent.incidents]
+        )
+        if WEATHER_BACKGROUND_REFRESH:
+            self.weather_refresher.start()
+        
+        # Retire quiet incidents to the archive tier
+        self.lifecycle = IncidentLifecycleManager(self.memory_agent)
+        if INCIDENT_LIFECYCLE_ENABLED:
+            self.lifecycle.start()
+        
+        # Background ingestion, decoupled from dashboard polling
+        self.ingestion = IngestionEngine(
+            self.pipeline,
+            lambda mock_mode: self.next_item(mock_mode, pace=True),
+            on_result=self.record_result,
+            num_workers=INGESTION_WORKERS,
+            queue_size=INGESTION_QUEUE_SIZE,
+            poll_interval=INGESTION_POLL_INTERVAL,
+            mock_mode=INGESTION_MOCK_MODE
+        )
+
+    def next_item(self, mock_mode, pace=False):
+        """
+        Pulls the next raw item from the mock replay corpus or the live feed.
+        
+        Args:
+            mock_mode (bool): Replay the mock corpus instead of the live feed.
+            pace (bool): Wait until the next mock item is due at REPLAY_RATE
+                (background ingestion); /simulate is paced by the dashboard instead.
+        
+        Returns:
+            dict: {"text", "source", "logs"} for an item, or a dict with
+            "status": "waiting" / "complete" when there is nothing to process.
+        """
+        if mock_mode:
+            row = self.mock_feed.get_next_incident(wait=pace)
+            if row is None:
+                return {"status": "complete", "message": "Replay corpus exhausted"}
+            with self.lock:
+                self.last_activity = time.time()
+            return {"text": row['text'], "source": row['source'], "logs": []}
+        
+        with self.lock:
+            incident = self.real_feed.get_next_incident()
+            if incident:
+                self.last_activity = time.time()
+                return {"text": incident['text'], "source": incident['source'], "logs": [], "extracted": incident.get('extracted')}
+            
+            if time.time() - self.last_activity <= 10:
+                return {"status": "waiting", "message": "No new incidents"}
+            # Claim the proactive search so concurrent callers don't all start one
+            self.last_activity = time.time()
+        
+        # Proactive Search Logic
+        import random
+        log_entries = []
+        log_entries.append("System: Idle for 10s. Initiating Proactive Search...")
+        
+        queries = [
+            "latest natural disasters news",
+            "breaking earthquake alerts twitter",
+            "flood warnings global",
+            "wildfire updates reddit",
+            "tsunami warning recent",
+            "site:facebook.com disaster reports public",
+            "site:twitter.com emergency alerts",
+            "site:reddit.com r/disasterupdate"
+        ]
+        query = random.choice(queries)
+        log_entries.append(f"Scout Agent: Proactively searching for '{query}'...")
+        
+        results = self.scout_agent.fetch_updates([query], mock_mode=False)
+        
+        if results:
+            # Use the first result as a new incident lead
+            best_result = results[0]
+            with self.lock:
+                self.last_activity = time.time()
+            return {
+                "text": best_result.get('content', ''),
+                "source": f"Proactive Scout ({best_result.get('source', 'Web')})",
+                "logs": log_entries
+            }
+        return {"status": "waiting", "message": "Proactive search yielded no results", "logs": log_entries}
+
+    def record_result(self, result):
+        """Bookkeeping for one processed item (from /simulate or an ingestion worker)."""
+        with self.lock:
+            self.processed_count += 1
+            self.logs.extend(result["logs"])
+        events.publish("log", {"lines": result["logs"], "raw_data": result["raw_data"]})
+
+    def shutdown(self):
+        """Stops background workers owned by this state."""
+        self.weather_refresher.stop()
+        self.lifecycle.stop()
+        self.real_feed.stop()
+        self.ingestion.stop()
+        self.pipeline.close()
+        self.memory_agent.close()
 
 state = SystemState()
 
+# Metrics read at scrape time
+CACHE_HITS = metrics.gauge("aura_cache_hits", "Cache hits since startup.", ["cache"])
+CACHE_MISSES = metrics.gauge("aura_cache_misses", "Cache misses since startup.", ["cache"])
+CACHE_HIT_RATIO = metrics.gauge("aura_cache_hit_ratio", "Cache hit ratio since startup.", ["cache"])
+CACHE_SIZE = metrics.gauge("aura_cache_entries", "Entries held in the in-memory cache tier.", ["cache"])
+INCIDENTS = metrics.gauge("aura_incidents", "Active incidents held by the MemoryAgent.")
+ARCHIVED_INCIDENTS = metrics.gauge("aura_incidents_archived", "Archived incidents held in memory.")
+INCIDENT_VERSION = metrics.gauge("aura_incident_store_version", "MemoryAgent change counter.")
+QUEUE_DEPTH = metrics.gauge("aura_ingestion_queue_depth", "Items waiting in the ingestion queue.")
+SSE_SUBSCRIBERS = metrics.gauge("aura_event_subscribers", "Connected /events clients.")
+
+def collect_state_metrics():
+    cache_stats = {f"llm_{agent}": stats for agent, stats in llm_cache.stats().items()}
+    cache_stats["geocode"] = geocode_cache.stats()
+    cache_stats["weather"] = state.verify_agent.weather_tool.cache.stats()
+    for name, stats in cache_stats.items():
+        CACHE_HITS.set(stats["hits"], cache=name)
+        CACHE_MISSES.set(stats["misses"], cache=name)
+        CACHE_HIT_RATIO.set(stats["hit_ratio"], cache=name)
+        CACHE_SIZE.set(stats["size"], cache=name)
+    INCIDENTS.set(len(state.memory_agent.incidents))
+    ARCHIVED_INCIDENTS.set(len(state.memory_agent.archive))
+    INCIDENT_VERSION.set(state.memory_agent.version)
+    QUEUE_DEPTH.set(state.ingestion.queue.qsize())
+    SSE_SUBSCRIBERS.set(events.stats()["subscribers"])
+
+metrics.register_collector(collect_state_metrics)
+
 # Models
 class SimulationRequest(BaseModel):
     mock_mode: bool = True
 
+class IngestionRequest(BaseModel):
+    mock_mode: bool = INGESTION_MOCK_MODE
+
 class LogEntry(BaseModel):
     timestamp: str
     level: str
     message: str
 
+# Lifecycle
+@app.on_event("startup")
+def start_background_ingestion():
+    if INGESTION_ENABLED:
+        state.ingestion.start()
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    state.shutdown()
+    close_session()
+
 # Endpoints
 @app.get("/status")
 def get_status():
     return {
         "status": "online",
         "incidents_count": len(state.memory_agent.incidents),
-        "processed_count": state.processed_count
+        "processed_count": state.processed_count,
+        "ingestion": state.ingestion.stats(),
+        "replay": state.mock_feed.stats(),
+        "live_feed": state.real_feed.stats(),
+        "events": events.stats(),
+        "llm_cache": llm_cache.stats(),
+        "rate_limits": limiter.stats(),
+        "incident_store": state.memory_agent.store.stats(),
+        "lifecycle": state.lifecycle.stats(),
+        "triage": state.triage.stats() if state.triage else None,
+        "dedup": state.dedup.stats() if state.dedup else None
     }
 
 @app.post("/reset")
-def reset_system():
+def reset_system(keep_incidents: bool = False):
+    """
+    Rebuilds the agents, feeds and workers.
+    
+    - keep_incidents: reload incidents from a durable store instead of deleting them
+      (400 with the in-memory store, which cannot keep anything across a reset).
+    """
     global state
+    if keep_incidents and not state.memory_agent.store.durable:
+        raise HTTPException(
+            status_code=400,
+            detail=f"keep_incidents needs a durable incident store (INCIDENT_STORE=sqlite), not '{state.memory_agent.store.name}'"
+        )
+    ingestion_running = state.ingestion.running
+    ingestion_mock_mode = state.ingestion.mock_mode
+    if not keep_incidents:
+        state.memory_agent.clear()
+    state.shutdown()
     state = SystemState()
+    if ingestion_running:
+        state.ingestion.start(mock_mode=ingestion_mock_mode)
+    events.publish("reset", {})
     return {"message": "System reset complete"}
 
 @app.get("/incidents")
-def get_incidents():
-    return state.memory_agent.get_all_incidents()
+def get_incidents(request: Request, since: int = 0, limit: int = 100, fields: str = None):
+    """
+    Versioned incidents API.
+    
+    - since: only incidents changed after this version (use next_cursor to page).
+    - limit: page size (max 1000).
+    - fields: comma-separated keys to return; "reports" is omitted unless requested,
+      and "*" returns everything.
+    
+    Responses carry an ETag; If-None-Match returns 304 when nothing changed.
+    """
+    limit = max(1, min(limit, 1000))
+    memory = state.memory_agent
+    
+    def make_etag(version):
+        return f'W/"{id(memory)}-{version}-{since}-{limit}-{fields or ""}"'
+    
+    # Cheap check before any serialization work
+    if request.headers.get("if-none-match") == make_etag(memory.version):
+        return Response(status_code=304, headers={"ETag": make_etag(memory.version)})
+    
+    if fields and fields != "*":
+        field_set = {f.strip() for f in fields.split(",") if f.strip()}
+    else:
+        field_set = fields
+    
+    page = memory.get_incidents_page(since=since, limit=limit, fields=field_set)
+    return JSONResponse(page, headers={"ETag": make_etag(page["version"]), "Cache-Control": "no-cache"})
+
+@app.get("/incidents/archive")
+def get_archived_incidents(limit: int = 100, offset: int = 0, type: str = None, fields: str = None):
+    """Archived (quiet) incidents, most recently archived first. fields works as in /incidents."""
+    limit = max(1, min(limit, 1000))
+    if fields and fields != "*":
+        fields = {f.strip() for f in fields.split(",") if f.strip()}
+    return state.memory_agent.get_archived_incidents(limit=limit, offset=max(0, offset), incident_type=type, fields=fields)
+
+@app.get("/incidents/{incident_id}/reports")
+def get_incident_reports(incident_id: int):
+    """Full report history of one incident, including reports archived out of /incidents."""
+    reports = state.memory_agent.get_report_history(incident_id)
+    if reports is None:
+        raise HTTPException(status_code=404, detail="Incident not found")
+    return {"incident_id": incident_id, "reports": reports}
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition of pipeline, dependency, cache and store metrics."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/events")
+async def stream_events(request: Request):
+    """
+    Server-Sent Events stream of incident changes ("created", "merged"), pipeline
+    log lines ("log"), "reset", and "resync" when a slow client missed events.
+    """
+    return StreamingResponse(
+        events.stream(request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/ingestion")
+def get_ingestion_status():
+    return state.ingestion.stats()
+
+@app.post("/ingestion/start")
+def start_ingestion(req: IngestionRequest):
+    state.ingestion.start(mock_mode=req.mock_mode)
+    state.ingestion.resume()
+    return state.ingestion.stats()
+
+@app.post("/ingestion/pause")
+def pause_ingestion():
+    state.ingestion.pause()
+    return state.ingestion.stats()
+
+@app.post("/ingestion/resume")
+def resume_ingestion():
+    state.ingestion.resume()
+    return state.ingestion.stats()
+
+@app.post("/ingestion/stop")
+def stop_ingestion():
+    state.ingestion.stop()
+    return state.ingestion.stats()
 
 @app.post("/simulate")
 def run_simulation_step(req: SimulationRequest):
     try:
         # 1. Get Data
-        text = ""
-        source = ""
-        
-        if req.mock_mode:
-            import pandas as pd
-            df = pd.read_csv("data/disaster_stream.csv")
-            # Loop indefinitely using modulo
-            row_index = state.processed_count % len(df)
-            row = df.iloc[row_index]
-            text = row['text']
-            source = row['source']
-            state.last_activity = time.time()
-        else:
-            incident = state.real_feed.get_next_incident()
-            if incident:
-                text = incident['text']
-                source = incident['source']
-                state.last_activity = time.time()
-            else:
-                # Proactive Search Logic
-                if time.time() - state.last_activity > 10:
-                    import random
-                    log_entries = []
-                    log_entries.append("System: Idle for 10s. Initiating Proactive Search...")
-                    
-                    queries = [
-                        "latest natural disasters news",
-                        "breaking earthquake alerts twitter",
-                        "flood warnings global",
-                        "wildfire updates reddit",
-                        "tsunami warning recent",
-                        "site:facebook.com disaster reports public",
-                        "site:twitter.com emergency alerts",
-                        "site:reddit.com r/disasterupdate"
-                    ]
-                    query = random.choice(queries)
-                    log_entries.append(f"Scout Agent: Proactively searching for '{query}'...")
-                    
-                    results = state.scout_agent.fetch_updates([query], mock_mode=False)
-                    
-                    if results:
-                        # Use the first result as a new incident lead
-                        best_result = results[0]
-                        text = best_result.get('content', '')
-                        source = f"Proactive Scout ({best_result.get('source', 'Web')})"
-                        state.last_activity = time.time()
-                        
-                        # Continue to processing...
-                    else:
-                        return {"status": "waiting", "message": "Proactive search yielded no results", "logs": log_entries}
-                else:
-                    return {"status": "waiting", "message": "No new incidents"}
+        item = state.next_item(req.mock_mode)
+        if item.get("status") in ("waiting", "complete"):
+            return item
 
         # 2. Process
-        start_time = time.time()
-        
-        # Extract
-        extracted = state.extract_agent.extract(text, mock_mode=req.mock_mode)
-        extracted["source"] = source
-        
-        if 'log_entries' not in locals():
-            log_entries = []
-        log_entries.append(f"Ingesting: {text[:50]}...")
-        
-        if extracted["incident_type"] != "Error":
-            log_entries.append(f"Extract Agent: Identified {extracted['incident_type']} at {extracted['location_text']}")
-            
-            # Scout
-            log_entries.append(f"Scout Agent: Generating search strategy...")
-            queries = state.scout_agent.generate_strategy(f"{extracted['incident_type']} in {extracted['location_text']}")
-            log_entries.append(f"Scout Agent: Executing {len(queries)} search queries...")
-            updates = state.scout_agent.fetch_updates(queries, mock_mode=req.mock_mode)
-            
-            # Verify
-            log_entries.append(f"Verify Agent: Cross-referencing {len(updates)} sources...")
-            verification = state.verify_agent.verify(extracted, search_results=updates)
-            log_entries.append(f"Verify Agent: Credibility Score {verification['credibility_score']}/100")
-            
-            if verification['is_verified']:
-                extracted.update(verification)
-                log_entries.append(f"Memory Agent: Consolidating incident...")
-                result = state.memory_agent.consolidate(extracted, mock_mode=req.mock_mode)
-                if 'incident_id' in result:
-                    extracted['id'] = result['incident_id']
-                log_entries.append(f"System: {result['action'].upper()} Incident #{result['incident_id']}")
-            else:
-                log_entries.append("Verify Agent: Rejected (Low Credibility)")
-        else:
-            log_entries.append("Extract Agent: Extraction Failed")
-
-        state.processed_count += 1
-        
-        # Only return the incident if it was verified and consolidated
-        final_incident = extracted if (extracted["incident_type"] != "Error" and extracted.get("is_verified")) else None
+        result = state.pipeline.process(
+            item["text"], item["source"], mock_mode=req.mock_mode, log_entries=item["logs"], extracted=item.get("extracted")
+        )
+        state.record_result(result)
 
-        return {
-            "status": "success",
-            "logs": log_entries,
-            "raw_data": {"text": text, "source": source, "timestamp": time.strftime("%H:%M:%S")},
-            "incident": final_incident
-        }
+        return {"status": "success", **result}
 
+    except RunCancelled:
+        return {"status": "cancelled", "message": "System was reset while this item was processing"}
     except Exception as e:
         print(f"Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
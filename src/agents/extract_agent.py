@@ -1,9 +1,51 @@
 import json
-import google.generativeai as genai
-from src.tools.map_tools import get_coordinates
-from src.config import GOOGLE_API_KEY, GEMINI_MODEL_NAME, DEFAULT_MAP_CENTER
-from src.prompts import EXTRACT_PROMPT
-from src.utils.rate_limiter import handle_rate_limit
+import time
+from src.tools.map_tools import get_coordinates, get_coordinates_batch
+from src.config import (
+    DEFAULT_MAP_CENTER,
+    EXTRACT_BATCH_TOKEN_BUDGET, EXTRACT_BATCH_MAX_ITEMS
+)
+from src.prompts import EXTRACT_PROMPT, EXTRACT_BATCH_PROMPT, EXTRACT_STRATEGY_PROMPT
+from src.utils.rate_limiter import handle_rate_limit, gemini_key, PRIORITY_HIGH
+from src.utils.llm_cache import llm_cache
+from src.utils.gemini_client import get_model
+from src.utils.metrics import FUSED_EXTRACTIONS
+from src.triage import guess_incident_type, guess_severity
+from src.utils.gazetteer import get_gazetteer
+
+def _parse_json_response(text):
+    """Strips markdown code fences from a model response and parses it as JSON."""
+    content = text.strip()
+    if content.startswith("```json"):
+        content = content[7:-3]
+    elif content.startswith("```"):
+        content = content[3:-3]
+    return json.loads(content)
+
+def _estimate_tokens(text):
+    """Rough token estimate (~4 characters per token), good enough for batch sizing."""
+    return len(text) // 4 + 1
+
+REQUIRED_KEYS = ("location_text", "incident_type", "severity", "summary", "confidence")
+
+def _parse_fused_response(text):
+    """
+    Parses and validates an EXTRACT_STRATEGY_PROMPT response.
+    Returns (extraction dict, queries); raises ValueError if anything is missing.
+    """
+    data = _parse_json_response(text)
+    if not isinstance(data, dict):
+        raise ValueError("Fused response is not a JSON object")
+    missing = [key for key in REQUIRED_KEYS if key not in data]
+    if missing:
+        raise ValueError(f"Fused response is missing {missing}")
+    queries = data.pop("search_queries", None)
+    if not isinstance(queries, list):
+        raise ValueError("Fused response has no search_queries list")
+    queries = [q.strip() for q in queries if isinstance(q, str) and q.strip()]
+    if not queries:
+        raise ValueError("Fused response has no usable search queries")
+    return data, queries[:3]
 
 class ExtractAgent:
     """
@@ -18,20 +60,19 @@ class ExtractAgent:
     3.  **Noise Filtering**: Discards irrelevant data before it enters the system.
     """
     def __init__(self):
-        if GOOGLE_API_KEY:
-            genai.configure(api_key=GOOGLE_API_KEY)
-            self.model = genai.GenerativeModel(GEMINI_MODEL_NAME)
-        else:
-            self.model = None
+        # Shared with the other agents (None without an API key)
+        self.model = get_model()
+        if not self.model:
             print("Warning: GOOGLE_API_KEY not found. ExtractAgent will use mock mode.")
 
-    def extract(self, text, mock_mode=False):
+    def extract(self, text, mock_mode=False, geocode=True):
         """
         Extracts structured data from unstructured text using Gemini 2.5 Flash.
         
         Args:
             text (str): The raw input text (tweet, news headline, etc.).
             mock_mode (bool): If True, uses regex/keyword matching instead of LLM (for testing).
+            geocode (bool): If False, "coordinates" may be missing; call locate() later.
             
         Returns:
             dict: A dictionary containing:
@@ -42,46 +83,21 @@ class ExtractAgent:
                 - confidence (float): The agent's confidence in the extraction.
         """
         if not self.model or mock_mode:
-            # Smart Mock: Detect specific locations in text
-            cities = {
-                "Shinjuku": [35.6938, 139.7034],
-                "Tokyo": [35.6762, 139.6503],
-                "Dadar": [19.0178, 72.8478],
-                "Mumbai": [19.0760, 72.8777],
-                "Katoomba": [-33.7125, 150.3119],
-                "Leura": [-33.7120, 150.3300],
-                "Blue Mountains": [-33.7125, 150.3119],
-                "Miami Beach": [25.7906, -80.1300],
-                "Ocean Drive": [25.7800, -80.1300],
-                "Grindavik": [63.8424, -22.4338],
-                "Keflavik": [63.9960, -22.5640],
-                "Turkana": [3.1167, 35.6000],
-                "Lodwar": [3.1167, 35.6000],
-                "Cusco": [-13.5319, -71.9675],
-                "Machu Picchu": [-13.1631, -72.5450],
-                "Valparaiso": [-33.0472, -71.6127],
-                "Munich": [48.1351, 11.5820],
-                "Cox's Bazar": [21.4272, 92.0058]
-            }
-            
-            detected_city = "Unknown Location"
-            coords = DEFAULT_MAP_CENTER
-            
-            for city, city_coords in cities.items():
-                if city.lower() in text.lower():
-                    detected_city = city
-                    coords = city_coords
-                    break
+            # Smart Mock: Resolve the most specific place named in the text (offline gazetteer)
+            gazetteer = get_gazetteer()
+            place = gazetteer.resolve(text) if gazetteer else None
+            detected_city = place.name if place else None
+            coords = list(place.coordinates) if place else DEFAULT_MAP_CENTER
             
             # Fallback for "5th and Elm" if no city found but it looks like a local report
-            if detected_city == "Unknown Location":
+            if not detected_city:
                 detected_city = "Global Monitor"
             
             return {
                 "location_text": detected_city,
                 "coordinates": coords,
-                "incident_type": "Fire" if "fire" in text.lower() else "Flood" if "flood" in text.lower() or "water" in text.lower() else "Earthquake" if "quake" in text.lower() else "Hazard",
-                "severity": "Critical" if "severe" in text.lower() or "massive" in text.lower() else "High",
+                "incident_type": guess_incident_type(text),
+                "severity": guess_severity(text),
                 "summary": text,
                 "confidence": 0.95
             }
@@ -96,22 +112,12 @@ class ExtractAgent:
         
         for attempt in range(retries):
             try:
-                response = self.model.generate_content(prompt)
-                # Clean up response to ensure it's valid JSON
-                content = response.text.strip()
-                if content.startswith("```json"):
-                    content = content[7:-3]
-                elif content.startswith("```"):
-                    content = content[3:-3]
-                
-                data = json.loads(content)
+                # Cached responses are only stored once they parse as valid JSON
+                data = llm_cache.generate(self.model, prompt, "extract", parse=_parse_json_response, priority=PRIORITY_HIGH)
                 
                 # Geocode the location
-                coords = get_coordinates(data.get("location_text", ""), mock_mode=mock_mode)
-                if coords:
-                    data["coordinates"] = coords
-                else:
-                    data["coordinates"] = DEFAULT_MAP_CENTER # Default fallback
+                if geocode:
+                    self.locate(data, mock_mode=mock_mode)
                     
                 return data
                 
@@ -119,8 +125,8 @@ class ExtractAgent:
                 last_error = e
                 print(f"Extraction error (Attempt {attempt+1}/{retries}): {e}")
                 
-                if handle_rate_limit(e):
-                    continue # Retry immediately after sleeping
+                if handle_rate_limit(e, gemini_key()):
+                    continue # Retry once the shared limiter allows it
                 else:
                     time.sleep(2 ** attempt) # Exponential backoff for non-rate-limit errors
         
@@ -132,3 +138,146 @@ class ExtractAgent:
             "summary": f"Failed to extract data. Error: {last_error}",
             "confidence": 0.0
         }
+
+    def locate(self, data, mock_mode=False):
+        """Geocodes data["location_text"] into data["coordinates"] unless already set."""
+        if "coordinates" not in data:
+            coords = get_coordinates(data.get("location_text", ""), mock_mode=mock_mode)
+            data["coordinates"] = coords if coords else DEFAULT_MAP_CENTER # Default fallback
+        return data
+
+    def extract_with_strategy(self, text, mock_mode=False, geocode=True):
+        """
+        Extraction and the Scout search queries from a single LLM call.
+
+        Returns:
+            tuple: (extraction dict as from extract(), list of queries). Queries are None
+                when the fused call was not used or its response did not validate; the
+                extraction then comes from the regular extract() path.
+        """
+        if not self.model or mock_mode:
+            return self.extract(text, mock_mode=mock_mode, geocode=geocode), None
+
+        prompt = EXTRACT_STRATEGY_PROMPT.format(text=text)
+        for attempt in range(3):
+            try:
+                # Only responses that validate are cached
+                data, queries = llm_cache.generate(self.model, prompt, "extract", parse=_parse_fused_response, priority=PRIORITY_HIGH)
+            except Exception as e:
+                if handle_rate_limit(e, gemini_key()):
+                    continue
+                print(f"Fused extraction failed, falling back to separate calls: {e}")
+                break
+
+            if geocode:
+                self.locate(data, mock_mode=mock_mode)
+            FUSED_EXTRACTIONS.inc(outcome="ok")
+            return data, queries
+
+        FUSED_EXTRACTIONS.inc(outcome="fallback")
+        return self.extract(text, mock_mode=mock_mode, geocode=geocode), None
+
+    def _plan_batches(self, texts, token_budget, max_items):
+        """
+        Splits texts into batches of indices whose prompts fit the token budget.
+        """
+        overhead = _estimate_tokens(EXTRACT_BATCH_PROMPT)
+        batches = []
+        current = []
+        used = overhead
+        for i, text in enumerate(texts):
+            # Each item costs its text plus its ID prefix in the prompt and its JSON object in the reply
+            cost = _estimate_tokens(text) + 60
+            if current and (used + cost > token_budget or len(current) >= max_items):
+                batches.append(current)
+                current = []
+                used = overhead
+            current.append(i)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def _extract_batch_raw(self, texts):
+        """
+        Sends one batch prompt and returns {position: data} for items that parsed.
+        Geocoding is left to the caller.
+        """
+        posts = "\n".join(f"[{i}] {json.dumps(text, ensure_ascii=False)}" for i, text in enumerate(texts))
+        prompt = EXTRACT_BATCH_PROMPT.format(posts=posts)
+        
+        def parse(text):
+            items = _parse_json_response(text)
+            if not isinstance(items, list):
+                raise ValueError("Batch extraction did not return a JSON array")
+            return items
+        
+        for attempt in range(3):
+            try:
+                items = llm_cache.generate(self.model, prompt, "extract", parse=parse)
+                break
+            except Exception as e:
+                print(f"Batch Extraction error (Attempt {attempt+1}/3): {e}")
+                if handle_rate_limit(e, gemini_key()):
+                    continue
+                time.sleep(2 ** attempt)
+        else:
+            return {}
+        
+        parsed = {}
+        for item in items:
+            if not isinstance(item, dict) or not all(k in item for k in REQUIRED_KEYS):
+                continue
+            try:
+                position = int(item.pop("id"))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 0 <= position < len(texts) and position not in parsed:
+                parsed[position] = item
+        return parsed
+
+    def extract_batch(self, texts, mock_mode=False, token_budget=EXTRACT_BATCH_TOKEN_BUDGET, max_items=EXTRACT_BATCH_MAX_ITEMS):
+        """
+        Extracts structured data from many posts with as few Gemini calls as possible.
+        
+        Posts are packed into EXTRACT_BATCH_PROMPT requests sized to fit the token budget.
+        Any post missing from (or malformed in) a batch reply falls back to extract().
+        Geocoding for the whole batch is deduplicated.
+        
+        Args:
+            texts (list): Raw input texts.
+            mock_mode (bool): If True, uses the keyword mock for each text.
+            token_budget (int): Approximate input tokens allowed per request.
+            max_items (int): Maximum posts per request.
+            
+        Returns:
+            list: One extraction dict per input text, in input order (same shape as extract()).
+        """
+        if not self.model or mock_mode:
+            return [self.extract(text, mock_mode=mock_mode) for text in texts]
+        
+        results = [None] * len(texts)
+        
+        for batch in self._plan_batches(texts, token_budget, max_items):
+            if len(batch) == 1:
+                # Nothing to pack; the single-item path also geocodes
+                results[batch[0]] = self.extract(texts[batch[0]])
+                continue
+            
+            parsed = self._extract_batch_raw([texts[i] for i in batch])
+            for position, i in enumerate(batch):
+                if position in parsed:
+                    results[i] = parsed[position]
+        
+        # Geocode everything the batch replies resolved, one lookup per distinct location
+        pending = [i for i, data in enumerate(results) if data is not None and "coordinates" not in data]
+        coords_list = get_coordinates_batch([results[i].get("location_text", "") for i in pending])
+        for i, coords in zip(pending, coords_list):
+            results[i]["coordinates"] = coords if coords else DEFAULT_MAP_CENTER # Default fallback
+        
+        # Fall back to single-item extraction for anything the batch could not parse
+        for i, data in enumerate(results):
+            if data is None:
+                results[i] = self.extract(texts[i])
+        
+        return results
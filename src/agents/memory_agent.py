@@ -1,30 +1,110 @@
+import threading
 import numpy as np
-from datetime import datetime
-import google.generativeai as genai
-from src.config import GOOGLE_API_KEY, GEMINI_MODEL_NAME
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from src.config import (
+    GOOGLE_API_KEY, INCIDENT_STORE, INCIDENT_DB_PATH, REPORT_ARCHIVE_PATH, MEMORY_MERGE_RADIUS_M, MEMORY_SAME_LOCATION_M,
+    INCIDENT_QUIET_HOURS, INCIDENT_ARCHIVE_SIZE, CONSOLIDATE_MAX_ROUNDS,
+    EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME, SIMILARITY_MATCH_THRESHOLD, SIMILARITY_REJECT_THRESHOLD
+)
 from src.prompts import SEMANTIC_SIMILARITY_PROMPT
-from src.utils.rate_limiter import handle_rate_limit
+from src.utils.rate_limiter import handle_rate_limit, gemini_key
+from src.utils.llm_cache import llm_cache
+from src.utils.gemini_client import get_model
+from src.utils.spatial_index import SpatialIndex, haversine_m
+from src.utils.embeddings import GeminiEmbedder, cosine_scores
+from src.utils.incident_store import create_incident_store
+from src.incident import Incident
 
 class MemoryAgent:
-    def __init__(self):
-        # In-memory storage for incidents
-        # Each incident is a dict with: id, type, location, severity, reports (list), last_updated
+    def __init__(self, store=None, embedder=None):
+        # In-memory storage for active incidents (src.incident.Incident, see to_dict() for the API shape)
         self.incidents = []
+        # Same incidents keyed by id, kept in order of last change (oldest first)
+        self.incidents_by_id = OrderedDict()
+        # Archive tier: incidents retired by sweep(), in the order they were archived.
+        # Still queryable, but no longer indexed or consolidated against.
+        self.archive = OrderedDict()
         self.next_id = 1
+        # Monotonic change counter; each incident records the version of its last change
+        self.version = 0
+        # Grid index over self.incidents keyed by incident type, so consolidation
+        # only looks at incidents in nearby cells instead of scanning the full list
+        self.index = SpatialIndex(cell_size_deg=0.01)
+        # Cached summary vector per incident id, computed once when the incident is created
+        self.embeddings = {}
+        # Guards the incident views; held while consolidation reads candidates and commits,
+        # but not during embedding or LLM similarity checks
+        self.lock = threading.RLock()
+        # Callbacks notified with (action, incident) after each create/merge/archive
+        self.listeners = []
         
-        if GOOGLE_API_KEY:
-            # Note: genai.configure is often called once, but this ensures it's set if other agents aren't used.
-            genai.configure(api_key=GOOGLE_API_KEY)
-            self.model = genai.GenerativeModel(GEMINI_MODEL_NAME)
-        else:
-            self.model = None
+        # Shared with the other agents (None without an API key)
+        self.model = get_model()
+        
+        # Embedding scores only settle clear-cut pairs without the LLM when a semantic
+        # embedder is configured; otherwise every nearby candidate gets the LLM check
+        if embedder is None and EMBEDDING_BACKEND == "gemini" and GOOGLE_API_KEY:
+            embedder = GeminiEmbedder(EMBEDDING_MODEL_NAME)
+        self.embedder = embedder
+        
+        # Persistence backend (INCIDENT_STORE); incidents saved by a previous run are loaded back
+        self.store = store or create_incident_store(INCIDENT_STORE, INCIDENT_DB_PATH, REPORT_ARCHIVE_PATH)
+        self._load()
+
+    def _load(self):
+        """
+        Rebuilds the in-memory views (list, change order, spatial index) from the store.
+        Embeddings are not restored; they are recomputed lazily on first comparison.
+        """
+        incidents, next_id, version = self.store.load()
+        for incident in incidents:
+            if incident.status == "archived":
+                self.archive[incident.id] = incident
+                continue
+            self.incidents.append(incident)
+            self.incidents_by_id[incident.id] = incident
+            self.index.insert(incident.type, incident.coordinates, incident)
+        self.next_id = next_id
+        self.version = version
+        if incidents:
+            print(f"MemoryAgent: Restored {len(self.incidents)} active and {len(self.archive)} archived incidents from {self.store.name} store.")
 
     def _calculate_distance(self, coord1, coord2):
         """
-        Calculate euclidean distance between two lat/long points.
-        For small distances, this is a sufficient approximation.
+        Calculate the haversine distance in meters between two lat/long points.
         """
-        return np.sqrt((coord1[0] - coord2[0])**2 + (coord1[1] - coord2[1])**2)
+        return haversine_m(coord1, coord2)
+
+    def _get_embedding(self, incident):
+        """
+        Returns the cached summary vector for an incident, embedding it on first use.
+        """
+        vec = self.embeddings.get(incident.id)
+        if vec is None:
+            vec = self.embedder.embed(incident.first_summary)
+            if vec is not None:
+                self.embeddings[incident.id] = vec
+        return vec
+
+    def _score_candidates(self, new_vec, candidates):
+        """
+        Scores a new summary's vector against every candidate incident with one vectorized
+        cosine computation. Returns a list of scores (None where no vector is available).
+        """
+        scores = [None] * len(candidates)
+        if not candidates or new_vec is None:
+            return scores
+        
+        vectors = [self._get_embedding(incident) for _, incident in candidates]
+        rows = [i for i, vec in enumerate(vectors) if vec is not None]
+        if not rows:
+            return scores
+        
+        sims = cosine_scores(new_vec, np.vstack([vectors[i] for i in rows]))
+        for i, sim in zip(rows, sims):
+            scores[i] = float(sim)
+        return scores
 
     def _check_semantic_similarity(self, text1, text2, mock_mode=False):
         """
@@ -41,10 +121,10 @@ class MemoryAgent:
         prompt = SEMANTIC_SIMILARITY_PROMPT.format(text1=text1, text2=text2)
         for attempt in range(3):
             try:
-                response = self.model.generate_content(prompt)
-                return "YES" in response.text.strip().upper()
+                text = llm_cache.generate(self.model, prompt, "memory")
+                return "YES" in text.strip().upper()
             except Exception as e:
-                if handle_rate_limit(e):
+                if handle_rate_limit(e, gemini_key()):
                     continue
                 return False
 
@@ -52,102 +132,315 @@ class MemoryAgent:
         """
         Checks if a new report matches an existing incident.
         If yes, merges it. If no, creates a new incident.
-        """
-        # Threshold for spatial merging (approx 1km or less)
-        DISTANCE_THRESHOLD = 0.01 
-        
-        best_match = None
-        min_dist = float('inf')
         
+        Candidates are looked up under the lock, but embedding and LLM similarity
+        checks run without it so other workers can consolidate meanwhile. The
+        match is re-validated under the lock before it is merged; incidents that
+        appeared in the meantime are checked in another round.
+        """
         new_coords = new_report.get("coordinates")
         if not new_coords:
             return None # Can't plot without location
+        
+        new_summary = new_report.get("summary", "")
+        checked = set()
+        best_match = None
+        new_vec = None
+        for attempt in range(CONSOLIDATE_MAX_ROUNDS):
+            with self.lock:
+                # The match may have been archived while the lock was released
+                if best_match is not None and self.incidents_by_id.get(best_match.id) is best_match:
+                    result = self._merge(best_match, new_report)
+                    self._commit(result, new_report)
+                    return result
+                candidates = [
+                    (dist, incident) for dist, incident
+                    in self.index.query(new_report["incident_type"], new_coords, MEMORY_MERGE_RADIUS_M)
+                    if incident.id not in checked
+                ]
+                # Last round: decide on location alone rather than release the lock again
+                if attempt == CONSOLIDATE_MAX_ROUNDS - 1:
+                    candidates = [(dist, incident) for dist, incident in candidates if dist < MEMORY_SAME_LOCATION_M]
+                    if candidates:
+                        result = self._merge(candidates[0][1], new_report)
+                    else:
+                        result = self._create(new_report, new_vec)
+                    self._commit(result, new_report)
+                    return result
+                if not candidates:
+                    result = self._create(new_report, new_vec)
+                    self._commit(result, new_report)
+                    return result
             
-        for incident in self.incidents:
-            # Check incident type match
-            if incident["type"] != new_report["incident_type"]:
-                continue
-                
-            # Check distance
-            dist = self._calculate_distance(new_coords, incident["coordinates"])
+            checked.update(incident.id for _, incident in candidates)
+            best_match, vec = self._find_match(new_summary, candidates, mock_mode)
+            new_vec = new_vec if vec is None else vec
+
+    def attach(self, incident_id, new_report):
+        """
+        Merges a report straight into a known incident, skipping the candidate search
+        (used for near-duplicates of a report that already produced the incident).
+        Returns the consolidate() result, or None if the incident is no longer active.
+        """
+        with self.lock:
+            incident = self.incidents_by_id.get(incident_id)
+            if incident is None:
+                return None
+            result = self._merge(incident, new_report)
+            self._commit(result, new_report)
+            return result
+
+    def _commit(self, result, new_report):
+        incident = self.incidents_by_id.get(result["incident_id"])
+        try:
+            self.store.save(result["action"], incident, new_report, self.next_id, self.version)
+        except Exception as e:
+            print(f"Incident Store Error: {e}")
+        self._notify(result["action"], incident)
+
+    def add_listener(self, callback):
+        """
+        Registers callback(action, incident), called after every "created" or "merged"
+        consolidation and for each incident "archived" by sweep(). Callbacks run under
+        the consolidation lock and must not block.
+        """
+        self.listeners.append(callback)
+
+    def _notify(self, action, incident):
+        for callback in list(self.listeners):
+            try:
+                callback(action, incident)
+            except Exception as e:
+                print(f"Memory Listener Error: {e}")
+
+    def _find_match(self, new_summary, candidates, mock_mode=False):
+        """
+        The closest candidate describing the same event (or None), plus the new
+        summary's vector if one was computed. Called without the lock held.
+        """
+        # Only embed and score if something is close enough to need a semantic check
+        needs_semantic = any(dist >= MEMORY_SAME_LOCATION_M for dist, _ in candidates)
+        new_vec = self.embedder.embed(new_summary) if needs_semantic and self.embedder else None
+        scores = self._score_candidates(new_vec, candidates)
+        
+        for (dist, incident), score in zip(candidates, scores):
+            # If distance is extremely small (e.g. same city coordinate), assume same event
+            if dist < MEMORY_SAME_LOCATION_M:
+                return incident, new_vec
+            
+            # Semantic Check: If close by, check if it's the same event.
+            # Clear embedding scores decide directly; only the ambiguous band goes to the LLM.
+            if score is not None and score >= SIMILARITY_MATCH_THRESHOLD:
+                is_same = True
+            elif score is not None and score < SIMILARITY_REJECT_THRESHOLD:
+                is_same = False
+            else:
+                # Compare against the summary of the first report in the incident
+                is_same = self._check_semantic_similarity(incident.first_summary, new_summary, mock_mode)
             
-            # Semantic Check: If close by, check if it's the same event
-            if dist < DISTANCE_THRESHOLD:
-                # If distance is extremely small (e.g. same city coordinate), assume same event
-                if dist < 0.001:
-                     if dist < min_dist:
-                        min_dist = dist
-                        best_match = incident
-                else:
-                    # Get the summary of the first report in the incident to compare
-                    existing_summary = incident["reports"][0].get("summary", "")
-                    new_summary = new_report.get("summary", "")
-                    
-                    if self._check_semantic_similarity(existing_summary, new_summary, mock_mode):
-                        if dist < min_dist:
-                            min_dist = dist
-                            best_match = incident
+            if is_same:
+                # Candidates are sorted by distance, so the first match is the closest
+                return incident, new_vec
+        return None, new_vec
+
+    def _create(self, new_report, vec=None):
+        new_incident = Incident.from_report(self.next_id, new_report)
+        self.incidents.append(new_incident)
+        self.incidents_by_id[new_incident.id] = new_incident
+        self._bump_version(new_incident)
+        self.index.insert(new_incident.type, new_incident.coordinates, new_incident)
+        # Reuse the vector scored for this summary; otherwise it is embedded on first comparison
+        if vec is not None:
+            self.embeddings[new_incident.id] = vec
+        self.next_id += 1
         
-        if best_match:
-            # Merge into existing incident
-            best_match["reports"].append(new_report)
-            best_match["last_updated"] = datetime.now().isoformat()
-            best_match["confidence"] = min(1.0, best_match["confidence"] + 0.1) # Increase confidence
+        return {
+            "action": "created",
+            "incident_id": new_incident.id,
+            "incident_title": f"{new_incident.type} at {new_incident.location_text}"
+        }
+
+    def _merge(self, incident, new_report):
+        # Merge into existing incident (confidence, severity, sources, report history)
+        evicted = incident.add_report(new_report)
+        self._bump_version(incident)
+        if evicted is not None:
+            try:
+                self.store.archive_reports(incident.id, [evicted])
+            except Exception as e:
+                print(f"Incident Store Error: {e}")
+        
+        return {
+            "action": "merged",
+            "incident_id": incident.id,
+            "incident_title": f"{incident.type} at {incident.location_text}"
+        }
+
+    def _bump_version(self, incident):
+        self.version += 1
+        incident.version = self.version
+        self.incidents_by_id.move_to_end(incident.id)
+
+    def sweep(self, now=None):
+        """
+        Archives every incident that has had no new report for its type's quiet period
+        (INCIDENT_QUIET_HOURS, keyed by type with a "default"). Returns the archived incidents.
+        """
+        now = now or datetime.now()
+        default_hours = INCIDENT_QUIET_HOURS.get("default", 24)
+        # Nothing changed after the shortest cutoff can be due yet
+        earliest = now - timedelta(hours=min(INCIDENT_QUIET_HOURS.values()))
+        
+        with self.lock:
+            expired = []
+            # Oldest change first, so the walk stops at the first recently updated incident
+            for incident in self.incidents_by_id.values():
+                last_updated = datetime.fromisoformat(incident.last_updated)
+                if last_updated > earliest:
+                    break
+                if last_updated <= now - timedelta(hours=INCIDENT_QUIET_HOURS.get(incident.type, default_hours)):
+                    expired.append(incident)
+            if not expired:
+                return []
             
-            # Update severity if new report is higher
-            # (Simple logic: Critical > High > Medium > Low)
-            severity_levels = {"Low": 1, "Medium": 2, "High": 3, "Critical": 4}
-            current_sev = severity_levels.get(best_match["severity"], 1)
-            new_sev = severity_levels.get(new_report["severity"], 1)
-            if new_sev > current_sev:
-                best_match["severity"] = new_report["severity"]
+            for incident in expired:
+                self._archive(incident)
+            self.incidents[:] = [incident for incident in self.incidents if incident.status == "active"]
             
-            # Merge sources
-            if "sources" not in best_match:
-                best_match["sources"] = []
+            evicted = []
+            while len(self.archive) > INCIDENT_ARCHIVE_SIZE:
+                evicted.append(self.archive.popitem(last=False)[0])
+            try:
+                self.store.update(expired, self.version)
+                if evicted:
+                    self.store.evict(evicted)
+            except Exception as e:
+                print(f"Incident Store Error: {e}")
             
-            new_sources = new_report.get("sources", [])
-            # Simple deduplication by title/url
-            existing_urls = {s.get("url") for s in best_match["sources"] if s.get("url")}
-            existing_titles = {s.get("title") for s in best_match["sources"] if not s.get("url")}
+            for incident in expired:
+                self._notify("archived", incident)
+            return expired
+
+    def _archive(self, incident):
+        del self.incidents_by_id[incident.id]
+        self.index.remove(incident.type, incident.coordinates, incident)
+        self.embeddings.pop(incident.id, None)
+        incident.status = "archived"
+        # Archiving is a change too, so delta clients learn to drop it
+        self.version += 1
+        incident.version = self.version
+        self.archive[incident.id] = incident
+
+    def get_archived_incidents(self, limit=100, offset=0, incident_type=None, fields=None):
+        """Archived incidents, most recently archived first (fields as in get_incidents_page)."""
+        with self.lock:
+            page = []
+            skipped = 0
+            for incident in reversed(self.archive.values()):
+                if incident_type and incident.type != incident_type:
+                    continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                if len(page) >= limit:
+                    break
+                page.append(incident.to_dict(fields))
+            return {"incidents": page, "total": len(self.archive)}
+
+    def get_all_incidents(self):
+        """All incidents in API form (see Incident.to_dict), including recent reports."""
+        with self.lock:
+            return [incident.to_dict("*") for incident in self.incidents]
+
+    def get_report_history(self, incident_id):
+        """
+        Every report of an incident, oldest first: archived reports followed by the
+        recent ones still held in memory. Returns None for an unknown incident.
+        """
+        with self.lock:
+            incident = self.incidents_by_id.get(incident_id) or self.archive.get(incident_id)
+            if incident is None:
+                return None
+            recent = [dict(report) for report in incident.reports]
+            archived_count = incident.report_count - len(recent)
+        if archived_count <= 0:
+            return recent
+        return self.store.report_history(incident_id)[:archived_count] + recent
+
+    def query_incidents(self, incident_type=None, updated_after=None, bbox=None, limit=None, status=None):
+        """
+        Incidents matching every given filter, most recently updated first.
+        Served by the store's indexes (type, last_updated, grid cell) rather than a scan.
+        
+        Args:
+            incident_type (str): Exact incident type.
+            updated_after (str): ISO timestamp; only incidents updated later.
+            bbox (tuple): (min_lat, min_lon, max_lat, max_lon).
+            limit (int): Maximum incidents to return.
+            status (str): "active" or "archived" (default: both).
+        """
+        ids = self.store.query(incident_type=incident_type, updated_after=updated_after, bbox=bbox, limit=limit, status=status)
+        with self.lock:
+            found = (self.incidents_by_id.get(i) or self.archive.get(i) for i in ids)
+            return [incident for incident in found if incident is not None]
+
+    def clear(self):
+        """Drops every incident, including persisted ones."""
+        with self.lock:
+            self.store.clear()
+            self.incidents.clear()
+            self.incidents_by_id.clear()
+            self.archive.clear()
+            self.index.clear()
+            self.embeddings.clear()
+            self.next_id = 1
+            self.version = 0
+
+    def close(self):
+        with self.lock:
+            self.store.close()
+
+    def get_incidents_page(self, since=0, limit=100, fields=None):
+        """
+        Returns incidents changed after version `since`, oldest change first.
+        
+        Pass the returned next_cursor back as `since` to fetch the next page;
+        since=0 pages through a full snapshot of active incidents. Deltas (since > 0)
+        also list the ids archived after `since` so clients can drop them.
+        
+        Args:
+            since (int): Only incidents whose version is greater than this.
+            limit (int): Maximum incidents to return.
+            fields (set): Keys to include (None = everything except "reports",
+                "*" = everything). "id" and "version" are always included.
+        
+        Returns:
+            dict: {"version", "incidents", "archived", "next_cursor", "has_more"}
+        """
+        with self.lock:
+            # Walk back from the most recent change until we reach `since`
+            changed = []
+            for incident in reversed(self.incidents_by_id.values()):
+                if incident.version <= since:
+                    break
+                changed.append(incident)
+            changed.reverse()
             
-            for src in new_sources:
-                if src.get("url"):
-                    if src["url"] not in existing_urls:
-                        best_match["sources"].append(src)
-                        existing_urls.add(src["url"])
-                else:
-                    if src.get("title") and src["title"] not in existing_titles:
-                        best_match["sources"].append(src)
-                        existing_titles.add(src["title"])
-                
-            return {
-                "action": "merged",
-                "incident_id": best_match["id"],
-                "incident_title": f"{best_match['type']} at {best_match['location_text']}"
-            }
-        else:
-            # Create new incident
-            new_incident = {
-                "id": self.next_id,
-                "type": new_report["incident_type"],
-                "location_text": new_report["location_text"],
-                "coordinates": new_report["coordinates"],
-                "severity": new_report["severity"],
-                "confidence": new_report["confidence"],
-                "sources": new_report.get("sources", []),
-                "reports": [new_report],
-                "created_at": datetime.now().isoformat(),
-                "last_updated": datetime.now().isoformat()
-            }
-            self.incidents.append(new_incident)
-            self.next_id += 1
+            page = changed[:limit]
+            has_more = len(changed) > limit
+            items = [incident.to_dict(fields) for incident in page]
+            
+            archived = []
+            if since > 0:
+                for incident in reversed(self.archive.values()):
+                    if incident.version <= since:
+                        break
+                    archived.append(incident.id)
             
             return {
-                "action": "created",
-                "incident_id": new_incident["id"],
-                "incident_title": f"{new_incident['type']} at {new_incident['location_text']}"
+                "version": self.version,
+                "incidents": items,
+                "archived": archived,
+                "next_cursor": page[-1].version if page else since,
+                "has_more": has_more
             }
-
-    def get_all_incidents(self):
-        return self.incidents
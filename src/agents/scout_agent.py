@@ -1,9 +1,23 @@
-import google.generativeai as genai
 import time
 import json
-from src.config import GOOGLE_API_KEY, GEMINI_MODEL_NAME
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from src.config import GEMINI_MODEL_NAME, SCOUT_MAX_CONCURRENCY, SCOUT_QUERY_TIMEOUT
 from src.prompts import SCOUT_PROMPT
-from src.utils.rate_limiter import handle_rate_limit
+from src.utils.rate_limiter import handle_rate_limit, limiter, gemini_key
+from src.utils.llm_cache import llm_cache
+from src.utils.gemini_client import get_model, get_search_client
+from src.utils.cache import MISS
+from src.utils.metrics import track_dependency
+
+def _parse_query_list(text):
+    """Strips markdown code fences from a model response and parses the JSON list of queries."""
+    text = text.strip()
+    # Clean up markdown code blocks if present
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1]
+    if text.endswith("```"):
+        text = text.rsplit("\n", 1)[0]
+    return json.loads(text)
 
 class ScoutAgent:
     """
@@ -15,11 +29,11 @@ class ScoutAgent:
     - Recency Filtering: Enforces checks to ensure data is current (ignoring old news).
     """
     def __init__(self):
-        if GOOGLE_API_KEY:
-            genai.configure(api_key=GOOGLE_API_KEY)
-            self.model = genai.GenerativeModel(GEMINI_MODEL_NAME)
-        else:
-            self.model = None
+        # Shared with the other agents (None without an API key)
+        self.model = get_model()
+        # Tools are reused across calls so their pooled connections stay warm
+        self.reddit_tool = None
+        self.news_tool = None
 
     def generate_strategy(self, incident_context):
         """
@@ -37,27 +51,33 @@ class ScoutAgent:
         
         for attempt in range(3):
             try:
-                response = self.model.generate_content(prompt)
-                text = response.text.strip()
-                # Clean up markdown code blocks if present
-                if text.startswith("```"):
-                    text = text.split("\n", 1)[1]
-                if text.endswith("```"):
-                    text = text.rsplit("\n", 1)[0]
-                return json.loads(text)
+                return llm_cache.generate(self.model, prompt, "scout", parse=_parse_query_list)
             except Exception as e:
-                if handle_rate_limit(e):
+                if handle_rate_limit(e, gemini_key()):
                     continue
                 print(f"Scout Strategy Error: {e}")
                 return [f"{incident_context} updates", f"site:twitter.com {incident_context}"]
 
-    def fetch_updates(self, queries, mock_mode=True):
+    def fetch_updates(self, queries, mock_mode=True, max_concurrency=None, timeout=None):
         """
         Executes the search queries. 
         If mock_mode is True, generates simulated 'real-time' social media snippets.
         If mock_mode is False, uses Gemini with Google Search Grounding.
+        
+        Queries are fanned out over a bounded thread pool so one slow grounded search
+        no longer delays the others. Results are merged back in query order.
+        
+        Args:
+            queries (list): Search queries, usually from generate_strategy().
+            mock_mode (bool): Use simulated snippets instead of live search.
+            max_concurrency (int): Max queries in flight (defaults to SCOUT_MAX_CONCURRENCY, 1 = serial).
+            timeout (float): Seconds allowed per query (defaults to SCOUT_QUERY_TIMEOUT).
         """
-        results = []
+        if not queries:
+            return []
+        
+        max_concurrency = max(1, max_concurrency or SCOUT_MAX_CONCURRENCY)
+        timeout = timeout if timeout is not None else SCOUT_QUERY_TIMEOUT
         
         # Check for google.genai (V2 SDK) availability
         try:
@@ -65,126 +85,201 @@ class ScoutAgent:
             genai_search_available = True
         except ImportError:
             genai_search_available = False
-            print("Warning: google.genai not found. Search capabilities limited.")
+            if not mock_mode:
+                print("Warning: google.genai not found. Search capabilities limited.")
         
         # Lazy import for Reddit
-        from src.tools.reddit_tool import RedditTool
-        reddit_tool = RedditTool()
+        if self.reddit_tool is None:
+            from src.tools.reddit_tool import RedditTool
+            self.reddit_tool = RedditTool()
+        reddit_tool = self.reddit_tool
+        
+        def run(query):
+            return self._run_query(query, mock_mode, reddit_tool, genai_search_available)
+        
+        # Even a single query or max_concurrency=1 goes through the pool, so that a hung
+        # search is abandoned after its timeout instead of blocking the item
+        workers = min(max_concurrency, len(queries))
+        # Index -> time the query began running; each query's timeout counts from there
+        started = {}
         
-        for query in queries:
+        def timed_run(i, query):
+            started[i] = time.monotonic()
+            return run(query)
+        
+        # Queued queries wait for a free slot; give up on any still queued once every
+        # "wave" could have used its full budget (abandoned searches keep their threads)
+        queue_deadline = time.monotonic() + timeout * -(-len(queries) // workers)
+        
+        def failed(query, content):
+            return [{"source": "System", "query": query, "content": content, "timestamp": "Just now"}]
+        
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scout")
+        try:
+            pending = {executor.submit(timed_run, i, query): i for i, query in enumerate(queries)}
+            outcomes = {}
+            while pending:
+                now = time.monotonic()
+                deadlines = [started[i] + timeout if i in started else queue_deadline for i in pending.values()]
+                done, _ = wait(list(pending), timeout=max(0.0, min(deadlines) - now), return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = pending.pop(future)
+                    try:
+                        outcomes[i] = future.result()
+                    except Exception as e:
+                        print(f"Scout Search Error: {e}")
+                        outcomes[i] = failed(queries[i], f"Failed to search: {e}")
+                
+                now = time.monotonic()
+                for future, i in list(pending.items()):
+                    deadline = started[i] + timeout if i in started else queue_deadline
+                    if now < deadline:
+                        continue
+                    # A query that began just now gets its full timeout
+                    if i not in started and not future.cancel():
+                        continue
+                    del pending[future]
+                    print(f"Scout Search Timeout: '{queries[i]}' exceeded {timeout:g}s")
+                    outcomes[i] = failed(queries[i], f"Search timed out after {timeout:g}s")
+            
+            results = []
+            for i in range(len(queries)):
+                results.extend(outcomes[i])
+            return results
+        finally:
+            # Don't block on stragglers that already timed out
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run_query(self, query, mock_mode, reddit_tool, genai_search_available):
+        """
+        Executes a single search query and returns its list of results.
+        Safe to call from worker threads.
+        """
+        results = []
+        
+        if mock_mode:
             # Simulate "Thinking/Searching" time
             time.sleep(0.3)
             
-            if mock_mode:
-                # ... (Mock logic) ...
-                platform = "Twitter" if "twitter" in query else "Reddit" if "reddit" in query else "Web"
-                keywords = query.replace("site:twitter.com", "").replace("site:reddit.com", "").strip()
+            platform = "Twitter" if "twitter" in query else "Reddit" if "reddit" in query else "Web"
+            keywords = query.replace("site:twitter.com", "").replace("site:reddit.com", "").strip()
+            
+            mock_content = f"LIVE REPORT: Situation regarding '{keywords}' is developing. Authorities are on scene. #alert"
+            if platform == "Twitter":
+                mock_content = f"@{platform}User: Can see the {keywords} from my window! It's getting huge. #emergency"
+            elif platform == "Reddit":
+                mock_content = f"r/{keywords}: Anyone else hearing those sirens near downtown? {keywords} confirmed."
+            
+            results.append({
+                "source": platform,
+                "query": query,
+                "content": mock_content,
+                "timestamp": "Just now"
+            })
+            return results
+        
+        # Real Data Integration
+        if query.startswith("r/"):
+            # Specific Subreddit Targeting
+            subreddit = query.split(" ")[0].replace("r/", "")
+            posts = reddit_tool.fetch_subreddit_posts(subreddit)
+            for post in posts:
+                post["query"] = query
+                results.append(post)
+        elif genai_search_available:
+            # Broad Web Search using Gemini Grounding (V2 SDK)
+            try:
+                # Use google.genai (V2 SDK) which supports google_search tool
+                from google.genai import types
+                
+                client = get_search_client()
+                if client is None:
+                    raise RuntimeError("GOOGLE_API_KEY not configured")
                 
-                mock_content = f"LIVE REPORT: Situation regarding '{keywords}' is developing. Authorities are on scene. #alert"
-                if platform == "Twitter":
-                    mock_content = f"@{platform}User: Can see the {keywords} from my window! It's getting huge. #emergency"
-                elif platform == "Reddit":
-                    mock_content = f"r/{keywords}: Anyone else hearing those sirens near downtown? {keywords} confirmed."
+                # We ask Gemini to summarize the search results for the query
+                search_prompt = f"Search for the LATEST updates on: {query}. Ignore any news older than 24 hours. Summarize the key facts found and explicitly state if the event is happening NOW."
                 
+                # Grounded results are cached briefly (see LLM_CACHE_TTLS["search"])
+                cache_key = llm_cache.make_key(GEMINI_MODEL_NAME, search_prompt, "google_search")
+                cached = llm_cache.get("search", cache_key)
+                if cached is not MISS:
+                    return [dict(cached, query=query)]
+                
+                # Retry loop for search
+                for attempt in range(3):
+                    try:
+                        limiter.acquire(gemini_key(), tokens=len(search_prompt) // 4)
+                        with track_dependency("grounded_search"):
+                            response = client.models.generate_content(
+                                model=GEMINI_MODEL_NAME,
+                                contents=search_prompt,
+                                config=types.GenerateContentConfig(
+                                    tools=[types.Tool(google_search=types.GoogleSearch())]
+                                )
+                            )
+                        
+                        # Extract content
+                        content = response.text.strip() if response.text else "No content generated."
+                        
+                        # Extract sources from grounding metadata if available
+                        citations = []
+                        # V2 SDK structure for grounding metadata
+                        if response.candidates and response.candidates[0].grounding_metadata:
+                            gm = response.candidates[0].grounding_metadata
+                            if hasattr(gm, 'grounding_chunks') and gm.grounding_chunks:
+                                for chunk in gm.grounding_chunks:
+                                    if chunk.web:
+                                        citations.append({
+                                            "title": chunk.web.title,
+                                            "url": chunk.web.uri
+                                        })
+                        
+                        source_label = "Google Search"
+                        if citations:
+                            titles = [c['title'] for c in citations if c.get('title')]
+                            source_label += f" ({', '.join(titles[:2])})"
+                        
+                        result = {
+                            "source": source_label,
+                            "citations": citations,
+                            "query": query,
+                            "content": content,
+                            "timestamp": "Just now"
+                        }
+                        llm_cache.set("search", cache_key, result)
+                        results.append(result)
+                        break # Success, exit retry loop
+                        
+                    except Exception as e:
+                        if handle_rate_limit(e, gemini_key()):
+                            continue
+                        print(f"Gemini V2 Search Error: {e}")
+                        results.append({
+                            "source": "System",
+                            "query": query,
+                            "content": f"Failed to search: {e}",
+                            "timestamp": "Just now"
+                        })
+                        break
+                
+            except Exception as e:
+                print(f"Gemini V2 Search Error: {e}")
                 results.append({
-                    "source": platform,
+                    "source": "System",
                     "query": query,
-                    "content": mock_content,
+                    "content": f"Failed to search: {e}",
                     "timestamp": "Just now"
                 })
-            else:
-                # Real Data Integration
-                
-                if query.startswith("r/"):
-                    # Specific Subreddit Targeting
-                    subreddit = query.split(" ")[0].replace("r/", "")
-                    posts = reddit_tool.fetch_subreddit_posts(subreddit)
-                    for post in posts:
-                        post["query"] = query
-                        results.append(post)
-                else:
-                    # Broad Web Search using Gemini Grounding (V2 SDK)
-                    if genai_search_available:
-                        try:
-                            # Use google.genai (V2 SDK) which supports google_search tool
-                            from google import genai
-                            from google.genai import types
-                            
-                            client = genai.Client(api_key=GOOGLE_API_KEY)
-                            
-                            # We ask Gemini to summarize the search results for the query
-                            # We ask Gemini to summarize the search results for the query
-                            search_prompt = f"Search for the LATEST updates on: {query}. Ignore any news older than 24 hours. Summarize the key facts found and explicitly state if the event is happening NOW."
-                            
-                            # Retry loop for search
-                            for attempt in range(3):
-                                try:
-                                    response = client.models.generate_content(
-                                        model=GEMINI_MODEL_NAME,
-                                        contents=search_prompt,
-                                        config=types.GenerateContentConfig(
-                                            tools=[types.Tool(google_search=types.GoogleSearch())]
-                                        )
-                                    )
-                                    
-                                    # Extract content
-                                    content = response.text.strip() if response.text else "No content generated."
-                                    
-                                    # Extract sources from grounding metadata if available
-                                    citations = []
-                                    # V2 SDK structure for grounding metadata
-                                    if response.candidates and response.candidates[0].grounding_metadata:
-                                        gm = response.candidates[0].grounding_metadata
-                                        if hasattr(gm, 'grounding_chunks') and gm.grounding_chunks:
-                                            for chunk in gm.grounding_chunks:
-                                                if chunk.web:
-                                                    citations.append({
-                                                        "title": chunk.web.title,
-                                                        "url": chunk.web.uri
-                                                    })
-                                    
-                                    source_label = "Google Search"
-                                    if citations:
-                                        titles = [c['title'] for c in citations if c.get('title')]
-                                        source_label += f" ({', '.join(titles[:2])})"
-                                    
-                                    results.append({
-                                        "source": source_label,
-                                        "citations": citations,
-                                        "query": query,
-                                        "content": content,
-                                        "timestamp": "Just now"
-                                    })
-                                    break # Success, exit retry loop
-                                    
-                                except Exception as e:
-                                    if handle_rate_limit(e):
-                                        continue
-                                    print(f"Gemini V2 Search Error: {e}")
-                                    results.append({
-                                        "source": "System",
-                                        "query": query,
-                                        "content": f"Failed to search: {e}",
-                                        "timestamp": "Just now"
-                                    })
-                                    break
-                            
-                        except Exception as e:
-                            print(f"Gemini V2 Search Error: {e}")
-                            results.append({
-                                "source": "System",
-                                "query": query,
-                                "content": f"Failed to search: {e}",
-                                "timestamp": "Just now"
-                            })
-                    else:
-                        # Fallback to NewsTool if Gemini Search is not available
-                        from src.tools.news_tool import NewsTool
-                        news_tool = NewsTool()
-                        news_query = query.replace("site:twitter.com", "").replace("site:reddit.com", "").strip()
-                        news_results = news_tool.fetch_news(news_query)
-                        for res in news_results:
-                            res["query"] = news_query
-                            results.append(res)
-                
+        else:
+            # Fallback to NewsTool if Gemini Search is not available
+            if self.news_tool is None:
+                from src.tools.news_tool import NewsTool
+                self.news_tool = NewsTool()
+            news_tool = self.news_tool
+            news_query = query.replace("site:twitter.com", "").replace("site:reddit.com", "").strip()
+            news_results = news_tool.fetch_news(news_query)
+            for res in news_results:
+                res["query"] = news_query
+                results.append(res)
+        
         return results
@@ -1,9 +1,22 @@
-import google.generativeai as genai
 import json
-from src.config import VERIFICATION_THRESHOLD, GOOGLE_API_KEY, GEMINI_MODEL_NAME
+from src.config import VERIFICATION_THRESHOLD
 from src.prompts import VERIFY_PROMPT
 from src.tools.weather_tool import WeatherTool
-from src.utils.rate_limiter import handle_rate_limit
+from src.utils.rate_limiter import handle_rate_limit, gemini_key, PRIORITY_HIGH
+from src.utils.llm_cache import llm_cache
+from src.utils.gemini_client import get_model
+
+def _parse_verdict(text):
+    """Strips markdown code fences from a model response and parses the verdict JSON."""
+    text = text.strip()
+    # Clean up markdown code blocks
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1]
+    if text.endswith("```"):
+        text = text.rsplit("\n", 1)[0]
+    if text.startswith("json"):
+        text = text[4:]
+    return json.loads(text)
 
 class VerifyAgent:
     """
@@ -18,20 +31,34 @@ class VerifyAgent:
     3.  **Contextual Awareness**: Uses weather data to validate environmental claims (e.g., "Flood" report vs. "0mm Rain" data).
     """
     def __init__(self):
-        if GOOGLE_API_KEY:
-            genai.configure(api_key=GOOGLE_API_KEY)
-            self.model = genai.GenerativeModel(GEMINI_MODEL_NAME)
-        else:
-            self.model = None
+        # Shared with the other agents (None without an API key)
+        self.model = get_model()
         self.weather_tool = WeatherTool()
 
-    def verify(self, incident_data, search_results=[]):
+    def weather_context(self, incident_data):
+        """
+        Weather evidence text for the incident's coordinates ("" when unavailable).
+        Only needs coordinates, so the pipeline can fetch it while the Scout searches.
+        """
+        if not self.model or not incident_data.get("coordinates"):
+            return ""
+        lat, lon = incident_data["coordinates"]
+        weather = self.weather_tool.fetch_weather(lat, lon)
+        if not weather:
+            return ""
+        weather_context = f"\n[Real-time Weather at Location]: {weather['description']}, Temp: {weather['temperature']}, Wind: {weather['wind_speed']}"
+        if weather['alerts']:
+            weather_context += f"\n[Active Weather Alerts]: {'; '.join(weather['alerts'])}"
+        return weather_context
+
+    def verify(self, incident_data, search_results=[], weather_context=None):
         """
         Verifies an incident by synthesizing multiple data sources.
         
         Args:
             incident_data (dict): The structured data from ExtractAgent.
             search_results (list): External intelligence gathered by ScoutAgent.
+            weather_context (str): Pre-fetched weather_context(); fetched here if None.
             
         Returns:
             dict: Verification results including:
@@ -48,15 +75,10 @@ class VerifyAgent:
         evidence_text = ""
         
         # 1. Weather Data (if coordinates available)
-        weather_context = ""
-        if incident_data.get("coordinates"):
-            lat, lon = incident_data["coordinates"]
-            weather = self.weather_tool.fetch_weather(lat, lon)
-            if weather:
-                weather_context = f"\n[Real-time Weather at Location]: {weather['description']}, Temp: {weather['temperature']}, Wind: {weather['wind_speed']}"
-                if weather['alerts']:
-                    weather_context += f"\n[Active Weather Alerts]: {'; '.join(weather['alerts'])}"
-                evidence_text += weather_context + "\n"
+        if weather_context is None:
+            weather_context = self.weather_context(incident_data)
+        if weather_context:
+            evidence_text += weather_context + "\n"
 
         # 2. Search Results
         if search_results:
@@ -74,17 +96,7 @@ class VerifyAgent:
 
         for attempt in range(3):
             try:
-                response = self.model.generate_content(prompt)
-                text = response.text.strip()
-                # Clean up markdown code blocks
-                if text.startswith("```"):
-                    text = text.split("\n", 1)[1]
-                if text.endswith("```"):
-                    text = text.rsplit("\n", 1)[0]
-                if text.startswith("json"):
-                    text = text[4:]
-                
-                data = json.loads(text)
+                data = llm_cache.generate(self.model, prompt, "verify", parse=_parse_verdict, priority=PRIORITY_HIGH)
                 
                 # Attach sources for UI display
                 sources = []
@@ -118,7 +130,7 @@ class VerifyAgent:
                 return data
                 
             except Exception as e:
-                if handle_rate_limit(e):
+                if handle_rate_limit(e, gemini_key()):
                     continue
                 print(f"Verification Error: {e}")
                 # Fallback to mock if LLM fails
@@ -25,5 +25,146 @@ DEFAULT_MAP_ZOOM = 2
 # Simulation Settings
 SIMULATION_SPEED_SECONDS = 1.0
 
+# Live Feed (Google News RSS)
+FEED_FETCH_INTERVAL = float(os.getenv("FEED_FETCH_INTERVAL", "300")) # Seconds between background refreshes
+FEED_REFRESH_JITTER = float(os.getenv("FEED_REFRESH_JITTER", "0.1")) # +/- fraction of the interval, spreads out replicas
+FEED_MIN_REFRESH_INTERVAL = float(os.getenv("FEED_MIN_REFRESH_INTERVAL", "30")) # Earliest early refresh when the buffer runs dry
+FEED_CACHE_SIZE = int(os.getenv("FEED_CACHE_SIZE", "500")) # Fetched items waiting to be consumed
+FEED_SEEN_SIZE = int(os.getenv("FEED_SEEN_SIZE", "10000")) # Title/link fingerprints remembered for dedup
+
+# Mock Mode Replay
+REPLAY_FILES = [p.strip() for p in os.getenv("REPLAY_FILES", "data/disaster_stream.csv").split(",") if p.strip()] # CSV/JSONL corpora
+REPLAY_RATE = os.getenv("REPLAY_RATE", "max") # "max", "realtime" (timestamp column) or items per second (0 = "max")
+REPLAY_SPEED = float(os.getenv("REPLAY_SPEED", "1")) # Realtime speed-up factor
+REPLAY_SHUFFLE = os.getenv("REPLAY_SHUFFLE", "false").lower() == "true"
+REPLAY_LOOP = os.getenv("REPLAY_LOOP", "true").lower() == "true"
+REPLAY_SEED = int(os.getenv("REPLAY_SEED")) if os.getenv("REPLAY_SEED") else None
+
 # Verification Threshold
 VERIFICATION_THRESHOLD = 70
+
+# Triage (local scoring before any LLM call)
+TRIAGE_ENABLED = os.getenv("TRIAGE_ENABLED", "true").lower() == "true"
+TRIAGE_DROP_THRESHOLD = float(os.getenv("TRIAGE_DROP_THRESHOLD", "0.25")) # Below: dropped without calling any agent
+TRIAGE_FAST_TRACK_THRESHOLD = float(os.getenv("TRIAGE_FAST_TRACK_THRESHOLD", "0.9")) # At/above (trusted source): Scout is skipped
+
+# Near-duplicate suppression (MinHash-LSH over a sliding window, before triage and the agents)
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_WINDOW_SECONDS = int(os.getenv("DEDUP_WINDOW_SECONDS", "3600")) # How long an item's fingerprint is remembered
+DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.85")) # Word/bigram Jaccard for a near-duplicate
+DEDUP_MIN_TOKENS = int(os.getenv("DEDUP_MIN_TOKENS", "6")) # Shorter texts are never treated as duplicates
+DEDUP_MAX_ENTRIES = int(os.getenv("DEDUP_MAX_ENTRIES", "20000"))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "64")) # MinHash signature length
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16")) # LSH bands (rows per band = NUM_PERM / BANDS)
+
+# Extraction Settings
+EXTRACT_BATCH_TOKEN_BUDGET = int(os.getenv("EXTRACT_BATCH_TOKEN_BUDGET", "6000")) # Approx. input tokens per batch request
+EXTRACT_BATCH_MAX_ITEMS = int(os.getenv("EXTRACT_BATCH_MAX_ITEMS", "25"))
+EXTRACT_FUSED_STRATEGY = os.getenv("EXTRACT_FUSED_STRATEGY", "false").lower() == "true" # One call for extraction + Scout queries
+
+# Pipeline Stage Graph
+PIPELINE_STAGE_WORKERS = int(os.getenv("PIPELINE_STAGE_WORKERS", "8")) # Threads for independent stages (0 = run stages serially)
+PIPELINE_SEARCH_TIMEOUT = float(os.getenv("PIPELINE_SEARCH_TIMEOUT", "45")) # Scout search; verification proceeds without it after this
+PIPELINE_WEATHER_TIMEOUT = float(os.getenv("PIPELINE_WEATHER_TIMEOUT", "10")) # Weather evidence; optional like search
+PIPELINE_SHUTDOWN_TIMEOUT = float(os.getenv("PIPELINE_SHUTDOWN_TIMEOUT", "30")) # /reset waits this long for in-flight items
+PIPELINE_OPTIONAL_STAGE_WORKERS = int(os.getenv("PIPELINE_OPTIONAL_STAGE_WORKERS", "8")) # Separate threads for search/weather, so hung calls cannot starve the other stages
+
+# Rate Limiting (process-wide, shared by all agents and tools; 0 = unlimited)
+RATE_LIMITER_ENABLED = os.getenv("RATE_LIMITER_ENABLED", "true").lower() == "true"
+RATE_LIMITS = {
+    # key: (requests per minute, tokens per minute)
+    "gemini": (int(os.getenv("GEMINI_RPM", "60")), int(os.getenv("GEMINI_TPM", "0"))),
+    "gemini_embedding": (int(os.getenv("GEMINI_EMBEDDING_RPM", "0")), 0),
+    "maps": (int(os.getenv("MAPS_RPM", "0")), 0),
+    "openweather": (int(os.getenv("OPENWEATHER_RPM", "60")), 0),
+    "reddit": (int(os.getenv("REDDIT_RPM", "30")), 0),
+    "google_news_rss": (int(os.getenv("GOOGLE_NEWS_RPM", "60")), 0),
+    "google_custom_search": (int(os.getenv("GOOGLE_SEARCH_RPM", "100")), 0),
+}
+
+# HTTP Client Settings (one pooled session shared by all tools)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "5")) # Default seconds per request when a tool doesn't set one
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "16")) # Distinct hosts kept warm
+HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", "8")) # Max open connections per host (callers wait beyond this)
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2")) # Retries on connection errors and 5xx (429s go through the rate limiter)
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.3"))
+
+# Scout Settings
+SCOUT_MAX_CONCURRENCY = int(os.getenv("SCOUT_MAX_CONCURRENCY", "4")) # Parallel search queries (1 = serial)
+SCOUT_QUERY_TIMEOUT = float(os.getenv("SCOUT_QUERY_TIMEOUT", "30")) # Seconds per search query
+
+
+# Memory Settings
+INCIDENT_STORE = os.getenv("INCIDENT_STORE", "memory") # "memory" (lost on restart) or "sqlite" (durable)
+INCIDENT_DB_PATH = os.getenv("INCIDENT_DB_PATH", ".cache/incidents.sqlite")
+INCIDENT_REPORT_HISTORY = max(1, int(os.getenv("INCIDENT_REPORT_HISTORY", "20"))) # Recent reports kept per incident (at least 1)
+INCIDENT_MAX_SOURCES = int(os.getenv("INCIDENT_MAX_SOURCES", "50")) # Distinct sources kept per incident
+REPORT_ARCHIVE_PATH = os.getenv("REPORT_ARCHIVE_PATH", ".cache/report_archive.jsonl") # Older reports (memory store; "" drops them)
+
+# Incident Lifecycle (quiet incidents move to the archive tier and stop being consolidated against)
+INCIDENT_LIFECYCLE_ENABLED = os.getenv("INCIDENT_LIFECYCLE_ENABLED", "true").lower() == "true"
+INCIDENT_SWEEP_INTERVAL = float(os.getenv("INCIDENT_SWEEP_INTERVAL", "60")) # Seconds between sweeps
+INCIDENT_ARCHIVE_SIZE = int(os.getenv("INCIDENT_ARCHIVE_SIZE", "5000")) # Archived incidents kept in memory
+# Hours without a new report before an incident is archived, per type. Override with INCIDENT_QUIET_HOURS_<TYPE>
+INCIDENT_QUIET_HOURS = {
+    incident_type: float(os.getenv(f"INCIDENT_QUIET_HOURS_{incident_type.upper()}", default))
+    for incident_type, default in {
+        "Fire": 12,
+        "Flood": 48,       # Floods stay relevant while water recedes
+        "Earthquake": 72,  # Aftershocks and damage reports trickle in for days
+        "Landslide": 24,
+        "Storm": 12,
+        "default": 24,
+    }.items()
+}
+MEMORY_MERGE_RADIUS_M = float(os.getenv("MEMORY_MERGE_RADIUS_M", "1100")) # Reports closer than this may be the same incident
+MEMORY_SAME_LOCATION_M = float(os.getenv("MEMORY_SAME_LOCATION_M", "110")) # Closer than this is assumed to be the same incident
+CONSOLIDATE_MAX_ROUNDS = max(1, int(os.getenv("CONSOLIDATE_MAX_ROUNDS", "3"))) # Similarity rounds before a report is placed on location alone
+
+# Similarity Settings (incident dedup)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "none") # "gemini" lets embedding scores skip the LLM check for clear-cut pairs
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "models/text-embedding-004")
+# For the "gemini" backend. The offline HashingEmbedder is not used here: on the mock
+# data it scores same-event posts 0.08-0.26 and different-district posts up to 0.985,
+# so no thresholds separate them. Starting values; tune against live traffic.
+SIMILARITY_MATCH_THRESHOLD = float(os.getenv("SIMILARITY_MATCH_THRESHOLD", "0.85")) # At or above: same event, no LLM call
+SIMILARITY_REJECT_THRESHOLD = float(os.getenv("SIMILARITY_REJECT_THRESHOLD", "0.35")) # Below: different event, no LLM call
+
+# Cache Settings
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", ".cache/aura_cache.sqlite") # On-disk cache tier ("" disables it)
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", "4096"))
+GEOCODE_CACHE_TTL = float(os.getenv("GEOCODE_CACHE_TTL", str(30 * 24 * 3600))) # Places don't move
+GEOCODE_NEGATIVE_TTL = float(os.getenv("GEOCODE_NEGATIVE_TTL", str(24 * 3600))) # Unresolvable addresses
+GEOCODE_TIMEOUT = float(os.getenv("GEOCODE_TIMEOUT", "5"))
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", "data/gazetteer.tsv") # Offline place index tried before the Geocoding API ("" disables it)
+
+# Weather Settings
+WEATHER_TIMEOUT = float(os.getenv("WEATHER_TIMEOUT", "5"))
+WEATHER_CACHE_RESOLUTION_DEG = float(os.getenv("WEATHER_CACHE_RESOLUTION_DEG", "0.1")) # Grid size (~11km) sharing one reading
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "600"))
+WEATHER_CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", "2048"))
+WEATHER_BACKGROUND_REFRESH = os.getenv("WEATHER_BACKGROUND_REFRESH", "false").lower() == "true"
+WEATHER_REFRESH_INTERVAL = float(os.getenv("WEATHER_REFRESH_INTERVAL", "300")) # Keep below WEATHER_CACHE_TTL
+
+# LLM Response Cache
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "2048")) # Entries kept in memory per agent
+LLM_CACHE_DISK = os.getenv("LLM_CACHE_DISK", "false").lower() == "true" # Also persist to CACHE_DB_PATH
+# Seconds a response stays valid, per agent. Override with LLM_CACHE_TTL_<AGENT>, e.g. LLM_CACHE_TTL_VERIFY=60
+LLM_CACHE_TTLS = {
+    agent: float(os.getenv(f"LLM_CACHE_TTL_{agent.upper()}", default))
+    for agent, default in {
+        "extract": 24 * 3600, # Same post -> same extraction
+        "scout": 3600,        # Search strategy for an incident context
+        "search": 300,        # Grounded search results go stale quickly
+        "verify": 600,
+        "memory": 24 * 3600,  # Same/different event decisions
+    }.items()
+}
+
+# Background Ingestion
+INGESTION_ENABLED = os.getenv("INGESTION_ENABLED", "false").lower() == "true" # Start workers at app startup
+INGESTION_MOCK_MODE = os.getenv("INGESTION_MOCK_MODE", "true").lower() == "true"
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+INGESTION_QUEUE_SIZE = int(os.getenv("INGESTION_QUEUE_SIZE", "100"))
+INGESTION_POLL_INTERVAL = float(os.getenv("INGESTION_POLL_INTERVAL", "2")) # Seconds between polls of an idle source
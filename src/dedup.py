@@ -0,0 +1,163 @@
+import re
+import time
+import hashlib
+import threading
+import numpy as np
+from collections import deque
+from src.config import (
+    DEDUP_WINDOW_SECONDS, DEDUP_SIMILARITY_THRESHOLD, DEDUP_MIN_TOKENS, DEDUP_MAX_ENTRIES,
+    DEDUP_NUM_PERM, DEDUP_BANDS
+)
+
+# Repost/syndication noise that should not change the fingerprint
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_RETWEET_RE = re.compile(r"^\s*(?:rt|via|repost(?:ed)?)\b\s*(?:@\w+)?\s*:?", re.IGNORECASE)
+_MENTION_RE = re.compile(r"@\w+")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an the and or but of in on at to is are was were be been for with by from this that it its as".split()
+)
+
+_MERSENNE_PRIME = (1 << 31) - 1
+
+def normalize_tokens(text):
+    """Lowercased content words without URLs, mentions, stopwords or a leading "RT @user:"."""
+    text = _RETWEET_RE.sub(" ", text or "")
+    text = _URL_RE.sub(" ", text)
+    text = _MENTION_RE.sub(" ", text)
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOPWORDS]
+
+def _feature_hash(feature):
+    # Stable across processes, unlike the built-in hash()
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=4).digest(), "little")
+
+def shingles(tokens):
+    """Hashed word unigrams and bigrams of a token list."""
+    features = set(tokens)
+    features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return frozenset(_feature_hash(feature) for feature in features)
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+class NearDuplicateDetector:
+    """
+    MinHash-LSH near-duplicate detection over a sliding time window.
+
+    Each item that produced an incident is remembered with its shingle set and the
+    incident id for window_seconds. A later item whose word unigram/bigram Jaccard
+    similarity with a remembered one reaches the threshold is a near-duplicate
+    (retweet, syndicated wire story, repost) and can be attached to that incident
+    without running the agents.
+
+    The MinHash signature is split into bands; only entries sharing at least one
+    band bucket are compared exactly, so a lookup does not scan the whole window.
+    """
+    def __init__(self, window_seconds=DEDUP_WINDOW_SECONDS, threshold=DEDUP_SIMILARITY_THRESHOLD,
+                 min_tokens=DEDUP_MIN_TOKENS, max_entries=DEDUP_MAX_ENTRIES,
+                 num_perm=DEDUP_NUM_PERM, bands=DEDUP_BANDS, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.window_seconds = window_seconds
+        self.threshold = threshold
+        self.min_tokens = min_tokens
+        self.max_entries = max_entries
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.RandomState(seed)
+        self.perm_a = rng.randint(1, _MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self.perm_b = rng.randint(0, _MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        # Entries oldest first: (timestamp, shingles, band keys, incident_id, report)
+        self.entries = deque()
+        # Band key -> entries sharing it
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, text):
+        """
+        (shingles, band keys) for the text, or None if it is too short to tell
+        reposts from different reports of the same kind.
+        """
+        tokens = normalize_tokens(text)
+        if len(tokens) < self.min_tokens:
+            return None
+        features = shingles(tokens)
+        hashes = np.fromiter(features, dtype=np.uint64, count=len(features))
+        # One row per permutation: (a * h + b) mod p, minimum over the shingles
+        signature = ((np.outer(self.perm_a, hashes) + self.perm_b[:, None]) % _MERSENNE_PRIME).min(axis=1)
+        keys = tuple(
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)
+        )
+        return features, keys
+
+    def _expire(self, now):
+        cutoff = now - self.window_seconds
+        while self.entries and (self.entries[0][0] < cutoff or len(self.entries) > self.max_entries):
+            entry = self.entries.popleft()
+            for key in entry[2]:
+                bucket = self.buckets.get(key)
+                if bucket is None:
+                    continue
+                bucket.remove(entry)
+                if not bucket:
+                    del self.buckets[key]
+
+    def find(self, fingerprint, now=None):
+        """
+        Returns (incident_id, report, similarity) of the most similar remembered twin
+        at or above the threshold, or None.
+        """
+        if fingerprint is None:
+            return None
+        features, keys = fingerprint
+        now = now or time.time()
+        with self.lock:
+            self._expire(now)
+            best = None
+            seen = set()
+            for key in keys:
+                for entry in self.buckets.get(key, ()):
+                    if id(entry) in seen:
+                        continue
+                    seen.add(id(entry))
+                    similarity = jaccard(features, entry[1])
+                    if similarity >= self.threshold and (best is None or similarity > best[2]):
+                        best = (entry[3], entry[4], similarity)
+            if best:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return best
+
+    def remember(self, fingerprint, incident_id, report, now=None):
+        """Records the item that produced (or merged into) an incident."""
+        if fingerprint is None:
+            return
+        features, keys = fingerprint
+        now = now or time.time()
+        entry = (now, features, keys, incident_id, report)
+        with self.lock:
+            self.entries.append(entry)
+            for key in keys:
+                self.buckets.setdefault(key, []).append(entry)
+            self._expire(now)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.buckets.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "window_seconds": self.window_seconds
+            }
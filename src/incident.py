@@ -0,0 +1,154 @@
+import sys
+from collections import deque
+from datetime import datetime
+from src.config import INCIDENT_REPORT_HISTORY, INCIDENT_MAX_SOURCES
+
+SEVERITY_LEVELS = {"Low": 1, "Medium": 2, "High": 3, "Critical": 4}
+
+# Keys every API/stream consumer sees, in the historical order of the incident dict
+INCIDENT_FIELDS = (
+    "id", "type", "location_text", "coordinates", "severity", "confidence", "sources",
+    "reports", "created_at", "last_updated", "version", "status", "report_count"
+)
+
+def _intern(value):
+    # Types, severities, places and source names repeat across thousands of reports
+    return sys.intern(value) if isinstance(value, str) and len(value) <= 200 else value
+
+def compact_report(report):
+    """
+    Copy of a report for the incident's history: strings interned, and without its own
+    "sources" (those are merged into the incident's deduplicated list).
+    """
+    return {_intern(k): _intern(v) for k, v in report.items() if k != "sources"}
+
+def _compact_source(src):
+    return {_intern(k): _intern(v) for k, v in src.items()}
+
+def _source_key(src):
+    return ("url", src["url"]) if src.get("url") else ("title", src.get("title"))
+
+class Incident:
+    """
+    One consolidated incident.
+
+    Only the most recent reports are kept (a ring of INCIDENT_REPORT_HISTORY); older ones
+    are handed back from add_report() for the caller to archive, while report_count and
+    source_counts keep the totals. The first report's summary is kept on its own since
+    consolidation compares new reports against it.
+    """
+    __slots__ = (
+        "id", "type", "location_text", "coordinates", "severity", "confidence",
+        "sources", "source_keys", "created_at", "last_updated", "version", "status",
+        "first_summary", "reports", "report_count", "source_counts"
+    )
+
+    def __init__(self, id, type, location_text, coordinates, severity, confidence,
+                 created_at=None, last_updated=None, version=0, status="active", first_summary="",
+                 sources=(), reports=(), report_count=0, source_counts=None):
+        now = datetime.now().isoformat()
+        self.id = id
+        self.type = _intern(type)
+        self.location_text = _intern(location_text)
+        self.coordinates = (float(coordinates[0]), float(coordinates[1]))
+        self.severity = _intern(severity)
+        self.confidence = confidence
+        self.created_at = created_at or now
+        self.last_updated = last_updated or now
+        self.version = version
+        self.status = status # "active", or "archived" once the lifecycle sweep retires it
+        self.first_summary = first_summary
+        self.sources = []
+        self.source_keys = set()
+        self._merge_sources(sources)
+        self.reports = deque(reports, maxlen=INCIDENT_REPORT_HISTORY)
+        self.report_count = report_count
+        self.source_counts = dict(source_counts or {})
+
+    @classmethod
+    def from_report(cls, incident_id, report):
+        incident = cls(
+            id=incident_id,
+            type=report["incident_type"],
+            location_text=report["location_text"],
+            coordinates=report["coordinates"],
+            severity=report["severity"],
+            confidence=report["confidence"],
+            first_summary=report.get("summary", ""),
+            sources=report.get("sources", [])
+        )
+        incident._record(report)
+        return incident
+
+    def _merge_sources(self, sources):
+        """Adds new sources, deduplicated by url (or title), up to INCIDENT_MAX_SOURCES."""
+        for src in sources:
+            if len(self.sources) >= INCIDENT_MAX_SOURCES:
+                break
+            if not src.get("url") and not src.get("title"):
+                continue
+            key = _source_key(src)
+            if key not in self.source_keys:
+                self.source_keys.add(key)
+                self.sources.append(_compact_source(src))
+
+    def _record(self, report):
+        """Appends to the report ring; returns the report pushed out of it, if any."""
+        evicted = self.reports[0] if len(self.reports) == self.reports.maxlen else None
+        self.reports.append(compact_report(report))
+        self.report_count += 1
+        source = _intern(report.get("source") or "unknown")
+        self.source_counts[source] = self.source_counts.get(source, 0) + 1
+        return evicted
+
+    def add_report(self, report):
+        """
+        Merges a matching report: bumps confidence, keeps the highest severity and
+        merges sources. Returns the report evicted from the history ring, or None.
+        """
+        self.last_updated = datetime.now().isoformat()
+        self.confidence = min(1.0, self.confidence + 0.1) # Increase confidence
+
+        # Update severity if new report is higher
+        if SEVERITY_LEVELS.get(report["severity"], 1) > SEVERITY_LEVELS.get(self.severity, 1):
+            self.severity = _intern(report["severity"])
+
+        self._merge_sources(report.get("sources", []))
+        return self._record(report)
+
+    def to_dict(self, fields=None):
+        """
+        API representation (the same keys the dict-based incidents had, plus status and report_count).
+
+        Args:
+            fields: None for everything except "reports", "*" for everything,
+                or a set of keys ("id" and "version" are always included).
+        """
+        if fields == "*":
+            keys = INCIDENT_FIELDS
+        elif fields is None:
+            keys = [k for k in INCIDENT_FIELDS if k != "reports"]
+        else:
+            keep = set(fields) | {"id", "version"}
+            keys = [k for k in INCIDENT_FIELDS if k in keep]
+
+        data = {}
+        for key in keys:
+            value = getattr(self, key)
+            if key == "coordinates":
+                value = list(value)
+            elif key in ("sources", "reports"):
+                value = [dict(item) for item in value]
+            data[key] = value
+        return data
+
+    def state(self):
+        """Everything needed to rebuild the incident except its report ring (for stores)."""
+        return {
+            "location_text": self.location_text,
+            "coordinates": list(self.coordinates),
+            "sources": self.sources,
+            "first_summary": self.first_summary,
+            "report_count": self.report_count,
+            "source_counts": self.source_counts
+        }
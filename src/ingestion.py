@@ -0,0 +1,180 @@
+import queue
+import threading
+from collections import deque
+from src.utils.dag_executor import RunCancelled
+
+class IngestionEngine:
+    """
+    Server-side ingestion: a producer thread pulls raw items from a source into a
+    bounded queue, and N worker threads run them through the pipeline.
+
+    The queue bound provides backpressure: when workers fall behind, the producer
+    blocks instead of pulling more items from the feed.
+
+    Args:
+        pipeline (Pipeline): Processes one item.
+        next_item (callable): next_item(mock_mode) -> {"text", "source", "logs"} (and optionally
+            "extracted", a finished extraction), or None / a {"status": ...} dict when idle.
+        on_result (callable): Called with each pipeline result (runs on worker threads).
+        num_workers (int): Number of worker threads.
+        queue_size (int): Maximum items waiting to be processed.
+        poll_interval (float): Seconds to wait before asking an idle source again.
+        mock_mode (bool): Passed to the source and pipeline.
+    """
+    def __init__(self, pipeline, next_item, on_result=None, num_workers=2, queue_size=100,
+                 poll_interval=2.0, mock_mode=True):
+        self.pipeline = pipeline
+        self.next_item = next_item
+        self.on_result = on_result
+        self.num_workers = max(1, num_workers)
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+        self.poll_interval = poll_interval
+        self.mock_mode = mock_mode
+
+        self.stop_event = threading.Event()
+        self.resume_event = threading.Event()
+        self.resume_event.set()
+        self.threads = []
+        self.lock = threading.Lock()
+
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.busy_workers = 0
+        self.producer_blocked = False
+        self.recent_errors = deque(maxlen=20)
+
+    @property
+    def running(self):
+        # Threads from an earlier run may still be finishing an item after stop()
+        return not self.stop_event.is_set() and any(t.is_alive() for t in self.threads)
+
+    @property
+    def paused(self):
+        return not self.resume_event.is_set()
+
+    def start(self, mock_mode=None):
+        if self.running:
+            return
+        if mock_mode is not None:
+            self.mock_mode = mock_mode
+        # A fresh event per run: threads of a stopped run keep their set event and exit,
+        # even if they have not noticed the stop yet
+        self.stop_event = stop_event = threading.Event()
+        # Anything a stopping producer slipped in after stop() belongs to the old run
+        self._drain()
+        self.threads = [threading.Thread(target=self._produce, args=(stop_event,), name="ingest-producer", daemon=True)]
+        self.threads += [
+            threading.Thread(target=self._work, args=(stop_event,), name=f"ingest-worker-{i}", daemon=True)
+            for i in range(self.num_workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        """Signals all threads to stop. Items still queued are dropped."""
+        self.stop_event.set()
+        self.resume_event.set()
+        self._drain()
+
+    def _drain(self):
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                return
+            self.queue.task_done()
+
+    def pause(self):
+        """Stops pulling and processing new items. In-flight items finish."""
+        self.resume_event.clear()
+
+    def resume(self):
+        self.resume_event.set()
+
+    def _wait_if_paused(self, stop_event):
+        while not self.resume_event.is_set() and not stop_event.is_set():
+            self.resume_event.wait(0.5)
+
+    def _produce(self, stop_event):
+        while not stop_event.is_set():
+            self._wait_if_paused(stop_event)
+            if stop_event.is_set():
+                break
+
+            try:
+                item = self.next_item(self.mock_mode)
+            except Exception as e:
+                print(f"Ingestion Source Error: {e}")
+                item = None
+
+            if not item or "status" in item:
+                # Idle source ("waiting"/"complete"): ask again later
+                stop_event.wait(self.poll_interval)
+                continue
+
+            # Block while the queue is full (backpressure), but stay responsive to stop()
+            with self.lock:
+                self.producer_blocked = self.queue.full()
+            while not stop_event.is_set():
+                try:
+                    self.queue.put(item, timeout=0.5)
+                    with self.lock:
+                        self.enqueued += 1
+                        self.producer_blocked = False
+                    break
+                except queue.Full:
+                    with self.lock:
+                        self.producer_blocked = True
+
+    def _work(self, stop_event):
+        while not stop_event.is_set():
+            self._wait_if_paused(stop_event)
+            try:
+                item = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            with self.lock:
+                self.busy_workers += 1
+            try:
+                result = self.pipeline.process(
+                    item["text"], item["source"], mock_mode=self.mock_mode, log_entries=item.get("logs"),
+                    extracted=item.get("extracted")
+                )
+                with self.lock:
+                    self.processed += 1
+                if self.on_result:
+                    self.on_result(result)
+            except RunCancelled:
+                # The pipeline was closed (e.g. by /reset) while this item was in flight
+                with self.lock:
+                    self.cancelled += 1
+            except Exception as e:
+                print(f"Ingestion Worker Error: {e}")
+                with self.lock:
+                    self.failed += 1
+                    self.recent_errors.append(str(e))
+            finally:
+                with self.lock:
+                    self.busy_workers -= 1
+                self.queue.task_done()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "running": self.running,
+                "paused": self.paused,
+                "mock_mode": self.mock_mode,
+                "workers": self.num_workers,
+                "busy_workers": self.busy_workers,
+                "queue_depth": self.queue.qsize(),
+                "queue_capacity": self.queue.maxsize,
+                "producer_blocked": self.producer_blocked,
+                "enqueued": self.enqueued,
+                "processed": self.processed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "recent_errors": list(self.recent_errors)
+            }
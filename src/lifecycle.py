@@ -0,0 +1,60 @@
+import time
+import threading
+from src.config import INCIDENT_SWEEP_INTERVAL
+
+class IncidentLifecycleManager:
+    """
+    Background sweep that moves quiet incidents out of the MemoryAgent's working set
+    (see MemoryAgent.sweep), so consolidation and /incidents only pay for what is
+    still developing.
+
+    Args:
+        memory_agent (MemoryAgent): Owner of the incidents.
+        interval (float): Seconds between sweeps.
+    """
+    def __init__(self, memory_agent, interval=INCIDENT_SWEEP_INTERVAL):
+        self.memory_agent = memory_agent
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.sweeps = 0
+        self.archived = 0
+        self.last_sweep_seconds = 0.0
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="incident-lifecycle", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def sweep_once(self):
+        """Runs one sweep and returns the number of incidents archived."""
+        start = time.perf_counter()
+        archived = self.memory_agent.sweep()
+        self.last_sweep_seconds = time.perf_counter() - start
+        self.sweeps += 1
+        self.archived += len(archived)
+        if archived:
+            print(f"Lifecycle: Archived {len(archived)} quiet incidents.")
+        return len(archived)
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.sweep_once()
+            except Exception as e:
+                print(f"Lifecycle Sweep Error: {e}")
+
+    def stats(self):
+        return {
+            "running": bool(self.thread and self.thread.is_alive() and not self.stop_event.is_set()),
+            "active": len(self.memory_agent.incidents),
+            "archived": len(self.memory_agent.archive),
+            "sweeps": self.sweeps,
+            "archived_total": self.archived,
+            "last_sweep_seconds": round(self.last_sweep_seconds, 4)
+        }
@@ -0,0 +1,230 @@
+import time
+from src.utils.metrics import STAGE_LATENCY, ITEMS_PROCESSED
+from src.triage import DROP, FAST_TRACK
+from src.utils.dag_executor import DagExecutor, Stage, RunCancelled
+from src.config import (
+    DEFAULT_MAP_CENTER, PIPELINE_STAGE_WORKERS, PIPELINE_OPTIONAL_STAGE_WORKERS, PIPELINE_SEARCH_TIMEOUT,
+    PIPELINE_WEATHER_TIMEOUT, PIPELINE_SHUTDOWN_TIMEOUT
+)
+
+class Pipeline:
+    """
+    The AURA processing chain for a single raw item:
+    (Dedup) -> (Triage) -> Extract -> Scout | Geocode -> Weather -> Verify -> Consolidate.
+
+    After the cheap pre-checks, the item runs as a stage graph (see _stages) on a
+    DagExecutor, so the Scout and the geocode/weather branch overlap. Each result
+    carries a trace of stage timings and the critical path.
+
+    With a NearDuplicateDetector, reposts of an item that already produced an
+    incident are attached to that incident directly. With a TriageFilter, obvious
+    noise is dropped before any agent runs and fast-tracked items skip the Scout stage.
+    With fused_strategy, the Scout queries come from the extraction call itself.
+
+    Shared by the /simulate endpoint and the background ingestion workers.
+    """
+    def __init__(self, extract_agent, scout_agent, verify_agent, memory_agent, triage=None, dedup=None, fused_strategy=False,
+                 stage_workers=None):
+        self.extract_agent = extract_agent
+        self.scout_agent = scout_agent
+        self.verify_agent = verify_agent
+        self.memory_agent = memory_agent
+        self.triage = triage
+        self.dedup = dedup
+        self.fused_strategy = fused_strategy
+        # Runs the per-item stage graph (see _stages); stage_workers=0 runs it serially
+        self.executor = DagExecutor(
+            max_workers=PIPELINE_STAGE_WORKERS if stage_workers is None else stage_workers,
+            optional_workers=PIPELINE_OPTIONAL_STAGE_WORKERS
+        )
+
+    def process(self, text, source, mock_mode=True, log_entries=None, extracted=None):
+        """
+        Runs one item through the pipeline.
+
+        Args:
+            text (str): The raw input text.
+            source (str): Where the text came from (shown in the UI).
+            mock_mode (bool): Use mock agents/tools instead of live APIs.
+            log_entries (list): Log lines gathered before processing (e.g. proactive search).
+            extracted (dict): Extraction already done for this item (e.g. batched by the
+                news feed); the extract stage then makes no LLM call.
+
+        Returns:
+            dict: {"logs": [...], "raw_data": {...}, "incident": dict or None,
+                "triage": {"decision", "score", "reason"} or None,
+                "duplicate_of": id of the incident a near-duplicate was attached to, or None,
+                "trace": {"stages", "critical_path", "critical_path_ms"} or None if the agents did not run}
+
+        Raises:
+            RunCancelled: The pipeline was closed before the item finished.
+        """
+        with STAGE_LATENCY.time(stage="total"):
+            try:
+                result = self._process(text, source, mock_mode, list(log_entries or []), extracted)
+            except RunCancelled:
+                ITEMS_PROCESSED.inc(outcome="cancelled")
+                raise
+        if result["duplicate_of"]:
+            outcome = "duplicate"
+        elif result["triage"] and result["triage"]["decision"] == DROP:
+            outcome = "dropped"
+        else:
+            outcome = "verified" if result["incident"] else "rejected"
+        ITEMS_PROCESSED.inc(outcome=outcome)
+        return result
+
+    def _process(self, text, source, mock_mode, log_entries, pre_extracted=None):
+        raw_data = {"text": text, "source": source, "timestamp": time.strftime("%H:%M:%S")}
+
+        # Near-duplicate of an item that already produced an incident
+        fingerprint = None
+        if self.dedup:
+            with STAGE_LATENCY.time(stage="dedup"):
+                fingerprint = self.dedup.fingerprint(text)
+                twin = self.dedup.find(fingerprint)
+            if twin:
+                incident_id, earlier, similarity = twin
+                report = dict(earlier, summary=text, source=source)
+                with STAGE_LATENCY.time(stage="consolidate"):
+                    result = self.memory_agent.attach(incident_id, report)
+                if result:
+                    report["id"] = incident_id
+                    log_entries.append(f"Ingesting: {text[:50]}...")
+                    log_entries.append(f"Dedup: Near-duplicate (similarity {similarity:.2f}), skipping agents")
+                    log_entries.append(f"System: {result['action'].upper()} Incident #{incident_id}")
+                    return {"logs": log_entries, "raw_data": raw_data, "incident": report, "triage": None, "duplicate_of": incident_id, "trace": None}
+
+        # Triage
+        triage = None
+        if self.triage:
+            with STAGE_LATENCY.time(stage="triage"):
+                triage = self.triage.evaluate(text, source)
+            if triage["decision"] == DROP:
+                log_entries.append(f"Ingesting: {text[:50]}...")
+                log_entries.append(f"Triage: Dropped (score {triage['score']:.2f}, {triage['reason']})")
+                return {"logs": log_entries, "raw_data": raw_data, "incident": None, "triage": triage, "duplicate_of": None, "trace": None}
+
+        # Extract, then the independent branches (Scout / geocode -> weather) run side by side
+        fast_track = bool(triage and triage["decision"] == FAST_TRACK)
+        stages = self._stages(text, source, mock_mode, fast_track, pre_extracted)
+        run = self.executor.run(stages)
+        extracted, fused_queries = run.results["extract"]
+        stage_trace = run.summary(stages)
+
+        log_entries.append(f"Ingesting: {text[:50]}...")
+
+        if extracted["incident_type"] != "Error":
+            log_entries.append(f"Extract Agent: Identified {extracted['incident_type']} at {extracted['location_text']}")
+
+            # Scout
+            updates = run.results["scout_search"]
+            if fast_track:
+                log_entries.append(f"Triage: Fast-tracked (score {triage['score']:.2f}), skipping Scout")
+            else:
+                if fused_queries:
+                    log_entries.append("Scout Agent: Using search strategy from extraction...")
+                else:
+                    log_entries.append("Scout Agent: Generating search strategy...")
+                queries = run.results["scout_strategy"] or fused_queries or []
+                log_entries.append(f"Scout Agent: Executing {len(queries)} search queries...")
+                if run.trace["scout_search"]["status"] == "timeout":
+                    log_entries.append("Scout Agent: Search timed out, continuing without it")
+
+            # Verify
+            verification = run.results["verify"]
+            log_entries.append(f"Verify Agent: Cross-referencing {len(updates)} sources...")
+            log_entries.append(f"Verify Agent: Credibility Score {verification['credibility_score']}/100")
+
+            if verification['is_verified']:
+                result = run.results["consolidate"]
+                log_entries.append("Memory Agent: Consolidating incident...")
+                if 'incident_id' in result:
+                    extracted['id'] = result['incident_id']
+                    if self.dedup:
+                        self.dedup.remember(fingerprint, result['incident_id'], {k: v for k, v in extracted.items() if k != 'id'})
+                log_entries.append(f"System: {result['action'].upper()} Incident #{result['incident_id']}")
+            else:
+                log_entries.append("Verify Agent: Rejected (Low Credibility)")
+        else:
+            log_entries.append("Extract Agent: Extraction Failed")
+
+        # Only return the incident if it was verified and consolidated
+        final_incident = extracted if (extracted["incident_type"] != "Error" and extracted.get("is_verified")) else None
+
+        return {
+            "logs": log_entries,
+            "raw_data": raw_data,
+            "incident": final_incident,
+            "triage": triage,
+            "duplicate_of": None,
+            "trace": stage_trace
+        }
+
+    def _stages(self, text, source, mock_mode, fast_track, pre_extracted=None):
+        """
+        The stage graph for one item:
+
+            extract -> scout_strategy -> scout_search --\
+                    -> geocode -> weather ---------------> verify -> consolidate
+
+        Search and weather are optional: on timeout or error verification goes ahead
+        without that evidence. Geocoding is optional too and falls back to
+        DEFAULT_MAP_CENTER. Everything after extract is skipped if extraction failed.
+        """
+        def extract(r):
+            if pre_extracted:
+                extracted, queries = dict(pre_extracted), None
+            elif self.fused_strategy:
+                extracted, queries = self.extract_agent.extract_with_strategy(text, mock_mode=mock_mode, geocode=False)
+            else:
+                extracted, queries = self.extract_agent.extract(text, mock_mode=mock_mode, geocode=False), None
+            extracted["source"] = source
+            return extracted, queries
+
+        def extracted_ok(r):
+            return r["extract"][0]["incident_type"] != "Error"
+
+        def located(r):
+            # Coordinates from geocode, or its fallback if the geocoder failed
+            extracted = r["extract"][0]
+            extracted.setdefault("coordinates", r["geocode"])
+            return extracted
+
+        def scouting(r):
+            return extracted_ok(r) and not fast_track
+
+        def scout_strategy(r):
+            extracted = r["extract"][0]
+            return self.scout_agent.generate_strategy(f"{extracted['incident_type']} in {extracted['location_text']}")
+
+        def scout_search(r):
+            queries = r["scout_strategy"] or r["extract"][1] or []
+            return self.scout_agent.fetch_updates(queries, mock_mode=mock_mode)
+
+        def verify(r):
+            return self.verify_agent.verify(located(r), search_results=r["scout_search"], weather_context=r["weather"])
+
+        def consolidate(r):
+            extracted = r["extract"][0]
+            extracted.update(r["verify"])
+            return self.memory_agent.consolidate(extracted, mock_mode=mock_mode)
+
+        return [
+            Stage("extract", extract),
+            Stage("geocode", lambda r: self.extract_agent.locate(dict(r["extract"][0]), mock_mode=mock_mode)["coordinates"],
+                  deps=["extract"], when=extracted_ok, optional=True, default=DEFAULT_MAP_CENTER),
+            Stage("scout_strategy", scout_strategy, deps=["extract"],
+                  when=lambda r: scouting(r) and not r["extract"][1]),
+            Stage("scout_search", scout_search, deps=["scout_strategy"], when=scouting,
+                  timeout=PIPELINE_SEARCH_TIMEOUT, optional=True, default=[]),
+            Stage("weather", lambda r: self.verify_agent.weather_context(located(r)), deps=["geocode"],
+                  when=extracted_ok, timeout=PIPELINE_WEATHER_TIMEOUT, optional=True, default=""),
+            Stage("verify", verify, deps=["scout_search", "weather"], when=extracted_ok),
+            Stage("consolidate", consolidate, deps=["verify"],
+                  when=lambda r: extracted_ok(r) and r["verify"]["is_verified"]),
+        ]
+
+    def close(self):
+        """Lets in-flight items finish (up to PIPELINE_SHUTDOWN_TIMEOUT), then stops the stage pools."""
+        self.executor.shutdown(timeout=PIPELINE_SHUTDOWN_TIMEOUT)
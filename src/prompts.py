@@ -17,6 +17,45 @@ Return ONLY a JSON object with the following keys:
 JSON:
 """
 
+EXTRACT_BATCH_PROMPT = """
+You are an expert disaster response coordinator.
+Analyze each of the following social media posts and extract structured data.
+
+Posts (one per line, prefixed with their ID):
+{posts}
+
+Return ONLY a JSON array with one object per post, in any order, each with the following keys:
+- id: The ID of the post (integer, exactly as given).
+- location_text: The specific location mentioned (e.g., "5th and Elm").
+- incident_type: The type of incident (e.g., "Fire", "Flood", "Earthquake").
+- severity: "Low", "Medium", "High", or "Critical".
+- summary: A brief 1-sentence summary of the situation.
+- confidence: A score from 0.0 to 1.0 indicating how confident you are that this is a real actionable incident.
+
+JSON:
+"""
+
+# Extraction and the Scout search strategy in one call (EXTRACT_FUSED_STRATEGY)
+EXTRACT_STRATEGY_PROMPT = """
+You are an expert disaster response coordinator.
+Analyze the following social media post, extract structured data and plan how to corroborate it.
+
+Post: "{text}"
+
+Return ONLY a JSON object with the following keys:
+- location_text: The specific location mentioned (e.g., "5th and Elm").
+- incident_type: The type of incident (e.g., "Fire", "Flood", "Earthquake").
+- severity: "Low", "Medium", "High", or "Critical".
+- summary: A brief 1-sentence summary of the situation.
+- confidence: A score from 0.0 to 1.0 indicating how confident you are that this is a real actionable incident.
+- search_queries: A list of 3 specific, high-value search queries to find real-time on-the-ground updates about this incident:
+  1. Target Twitter for recent posts (use site:twitter.com and include "latest" or "now").
+  2. Target Reddit: If you know a specific local subreddit (e.g., r/LosAngeles), use "r/LosAngeles". If not, use "site:reddit.com".
+  3. Target local news or official alerts with keywords like "today", "live", or "current".
+
+JSON:
+"""
+
 # --- Memory Agent ---
 SEMANTIC_SIMILARITY_PROMPT = """
 Do these two disaster reports refer to the same specific event?
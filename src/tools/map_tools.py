@@ -1,43 +1,154 @@
 import os
-import requests
+import re
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from src.config import CACHE_DB_PATH, GEOCODE_CACHE_SIZE, GEOCODE_CACHE_TTL, GEOCODE_NEGATIVE_TTL, GEOCODE_TIMEOUT
+from src.utils.cache import TTLCache, MISS
+from src.utils.http_client import http_get
+from src.utils.metrics import track_dependency, GAZETTEER_LOOKUPS
+from src.utils.rate_limiter import limiter
+from src.utils.gazetteer import get_gazetteer
 
 load_dotenv()
 
+# Normalized address -> [lat, lng] (or None for addresses the API could not resolve)
+geocode_cache = TTLCache(
+    max_entries=GEOCODE_CACHE_SIZE,
+    ttl=GEOCODE_CACHE_TTL,
+    disk_path=CACHE_DB_PATH,
+    namespace="geocode"
+)
+
+def normalize_address(address):
+    """
+    Normalizes an address for cache lookups ("  Tokyo, " and "tokyo" share an entry).
+    """
+    address = re.sub(r"\s+", " ", (address or "").lower())
+    return address.strip(" ,.;:")
+
+def _gazetteer_coordinates(address):
+    """
+    Coordinates from the offline gazetteer when the address is just place names
+    ("Shinjuku, Tokyo"); None when it needs a real geocoder.
+    """
+    gazetteer = get_gazetteer()
+    if not gazetteer:
+        return None
+    place = gazetteer.resolve_address(address or "")
+    GAZETTEER_LOOKUPS.inc(result="hit" if place else "miss")
+    return place.coordinates if place else None
+
+def _mock_coordinates(address):
+    # Fallback/Mock for testing if no key is present
+    # In a real scenario, we might want to raise an error or log a warning.
+    # For this hackathon demo, we can return a default location or mock based on known addresses.
+    if "5th" in address and "Elm" in address:
+        return 34.0430, -118.2673 # Example coords
+    if "West LA" in address:
+        return 34.0500, -118.4400
+    if "Downtown" in address or "downtown" in address:
+        return 34.0407, -118.2468
+    return 34.0522, -118.2437 # Default Los Angeles
+
 def get_coordinates(address, mock_mode=False):
     """
     Geocodes an address using Google Maps Geocoding API.
     Returns (lat, lng) tuple or None if not found.
+
+    Addresses made only of known place names are resolved from the offline gazetteer
+    without an API call. Other results are cached by normalized address (in memory
+    and on disk), including addresses the API could not resolve.
     """
+    coords = _gazetteer_coordinates(address)
+    if coords:
+        return coords
+
     api_key = os.getenv("MAPS_API_KEY")
     if not api_key or mock_mode:
-        # Fallback/Mock for testing if no key is present
-        # In a real scenario, we might want to raise an error or log a warning.
-        # For this hackathon demo, we can return a default location or mock based on known addresses.
-        if "5th" in address and "Elm" in address:
-            return 34.0430, -118.2673 # Example coords
-        if "West LA" in address:
-            return 34.0500, -118.4400
-        if "Downtown" in address or "downtown" in address:
-            return 34.0407, -118.2468
-        return 34.0522, -118.2437 # Default Los Angeles
+        return _mock_coordinates(address)
+
+    key = normalize_address(address)
+    if not key:
+        return None
+
+    cached = geocode_cache.get(key)
+    if cached is not MISS:
+        return tuple(cached) if cached else None
 
+    return _fetch_coordinates(key, address, api_key)
+
+def _fetch_coordinates(key, address, api_key):
+    """
+    Calls the Geocoding API for one address and stores the result under key.
+    """
     base_url = "https://maps.googleapis.com/maps/api/geocode/json"
     params = {
         "address": address,
         "key": api_key
     }
-    
+
     try:
-        response = requests.get(base_url, params=params)
-        data = response.json()
-        
+        limiter.acquire("maps")
+        with track_dependency("maps_geocoding"):
+            response = http_get(base_url, params=params, timeout=GEOCODE_TIMEOUT)
+            data = response.json()
+
         if data['status'] == 'OK':
             location = data['results'][0]['geometry']['location']
-            return location['lat'], location['lng']
+            coords = (location['lat'], location['lng'])
+            geocode_cache.set(key, list(coords))
+            return coords
         else:
             print(f"Geocoding error: {data['status']}")
+            if data['status'] == 'ZERO_RESULTS':
+                # Only cache definitive misses; quota/denied errors are transient
+                geocode_cache.set(key, None, ttl=GEOCODE_NEGATIVE_TTL)
             return None
     except Exception as e:
         print(f"Geocoding exception: {e}")
         return None
+
+def get_coordinates_batch(addresses, mock_mode=False, max_workers=4):
+    """
+    Geocodes many addresses in one call.
+
+    Addresses are deduplicated by their normalized form; gazetteer and cache hits
+    are served directly and the remaining lookups run in parallel.
+
+    Returns:
+        list: (lat, lng) tuples or None, aligned with the input addresses.
+    """
+    api_key = os.getenv("MAPS_API_KEY")
+    if not api_key or mock_mode:
+        return [_gazetteer_coordinates(address) or _mock_coordinates(address) for address in addresses]
+
+    unique = {}
+    for address in addresses:
+        unique.setdefault(normalize_address(address), address)
+
+    resolved = {}
+    pending = []
+    for key, address in unique.items():
+        if not key:
+            resolved[key] = None
+            continue
+        coords = _gazetteer_coordinates(address)
+        if coords:
+            resolved[key] = coords
+            continue
+        cached = geocode_cache.get(key)
+        if cached is not MISS:
+            resolved[key] = tuple(cached) if cached else None
+        else:
+            pending.append((key, address))
+
+    if len(pending) == 1 or max_workers <= 1:
+        for key, address in pending:
+            resolved[key] = _fetch_coordinates(key, address, api_key)
+    elif pending:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+            results = executor.map(lambda p: _fetch_coordinates(p[0], p[1], api_key), pending)
+            for (key, _), coords in zip(pending, results):
+                resolved[key] = coords
+
+    return [resolved[normalize_address(address)] for address in addresses]
@@ -1,22 +1,47 @@
-import requests
+import threading
 import xml.etree.ElementTree as ET
 from urllib.parse import quote
+from src.utils.http_client import http_get
+from src.utils.metrics import track_dependency
+from src.utils.rate_limiter import limiter
 
 class NewsTool:
     def __init__(self):
         # Global search
         self.base_url = "https://news.google.com/rss/search?q={}&hl=en-US&gl=US&ceid=US:en"
+        # ETag / Last-Modified per feed URL, for conditional requests
+        self.validators = {}
+        self.lock = threading.Lock()
 
-    def fetch_news(self, query, limit=3):
+    def fetch_news(self, query, limit=3, conditional=False):
         """
         Fetches news headlines from Google News RSS.
+        
+        With conditional=True the request carries If-None-Match / If-Modified-Since from
+        the previous response for the same query, and an unchanged feed (304) returns [].
         """
         encoded_query = quote(query)
         url = self.base_url.format(encoded_query)
         
+        headers = {}
+        if conditional:
+            with self.lock:
+                etag, last_modified = self.validators.get(url, (None, None))
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        
         try:
-            response = requests.get(url, timeout=5)
+            limiter.acquire("google_news_rss")
+            with track_dependency("google_news_rss"):
+                response = http_get(url, headers=headers)
+            if response.status_code == 304:
+                return []
             if response.status_code == 200:
+                if conditional:
+                    with self.lock:
+                        self.validators[url] = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
                 root = ET.fromstring(response.content)
                 items = root.findall(".//item")
                 results = []
@@ -1,12 +1,68 @@
 from src.tools.news_tool import NewsTool
+from src.config import (
+    FEED_FETCH_INTERVAL, FEED_REFRESH_JITTER, FEED_MIN_REFRESH_INTERVAL, FEED_CACHE_SIZE, FEED_SEEN_SIZE
+)
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import re
 import time
+import random
+import threading
+
+_NON_WORD_RE = re.compile(r"\W+", re.UNICODE)
+
+def _normalize_title(title):
+    """Case/punctuation-insensitive form of a headline."""
+    return _NON_WORD_RE.sub(" ", (title or "").lower()).strip()
+
+def _normalize_link(link):
+    """Link without scheme, query string or fragment (tracking params vary per fetch)."""
+    if not link:
+        return ""
+    parts = urlsplit(link.strip())
+    return f"{parts.netloc.lower()}{parts.path.rstrip('/')}"
 
 class RealIncidentFeed:
-    def __init__(self):
+    """
+    Live headlines from Google News RSS.
+
+    The queries are fetched in parallel with conditional requests, so an unchanged feed
+    costs a 304. Items are deduplicated by normalized title and link against a bounded
+    set of fingerprints, queued in a bounded buffer and handed out once each via a
+    consumer cursor.
+
+    Refreshes run on a background thread (started on first use) every fetch_interval
+    with random jitter. get_next_incident() never waits on the network: it serves what
+    is already buffered and, when the data is stale or drained, wakes the refresher.
+
+    With an extractor (e.g. ExtractAgent.extract_batch), each refresh's new headlines
+    are extracted together before they are queued, and every item carries its
+    result as "extracted".
+    """
+    def __init__(self, fetch_interval=FEED_FETCH_INTERVAL, cache_size=FEED_CACHE_SIZE, seen_size=FEED_SEEN_SIZE,
+                 jitter=FEED_REFRESH_JITTER, min_refresh_interval=FEED_MIN_REFRESH_INTERVAL, extractor=None):
         self.news_tool = NewsTool()
-        self.cache = []
+        self.extractor = extractor
+        self.cache = deque(maxlen=cache_size)
+        # Absolute position of cache[0] and of the next item to hand out
+        self.head = 0
+        self.cursor = 0
+        self.seen = OrderedDict() # Fingerprints of titles/links already queued, oldest first
+        self.seen_size = seen_size
+        self.lock = threading.Lock()
         self.last_fetch = 0
-        self.fetch_interval = 300  # Fetch every 5 minutes
+        self.fetch_interval = fetch_interval
+        self.jitter = jitter
+        # Jittered delay the refresher is currently sleeping for
+        self.scheduled_delay = fetch_interval
+        self.min_refresh_interval = min_refresh_interval
+        # Background refresher: a single thread, so refreshes never overlap
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.wake_event = threading.Event()
+        self.refreshing = False
+        self.refresh_errors = 0
         self.queries = [
             "breaking disaster news",
             "earthquake alert",
@@ -15,40 +71,138 @@ class RealIncidentFeed:
             "tsunami alert",
             "hurricane tracker"
         ]
-        self.current_index = 0
+        self.fetched = 0
+        self.duplicates = 0
+        self.dropped = 0
+
+    def _fingerprints(self, res):
+        keys = []
+        title = _normalize_title(res.get("content"))
+        if title:
+            keys.append(hash(("title", title)))
+        link = _normalize_link(res.get("url"))
+        if link:
+            keys.append(hash(("link", link)))
+        return keys
+
+    def _remember(self, keys):
+        for key in keys:
+            self.seen[key] = None
+        while len(self.seen) > self.seen_size:
+            self.seen.popitem(last=False)
 
     def fetch_fresh_incidents(self):
-        """Fetches new incidents from Google News RSS."""
-        new_incidents = []
-        for query in self.queries:
-            results = self.news_tool.fetch_news(query, limit=5)
-            for res in results:
-                # Deduplicate based on title
-                if not any(i['text'] == res['content'] for i in self.cache):
-                    new_incidents.append({
+        """Fetches new incidents from Google News RSS. Returns how many were queued."""
+        with ThreadPoolExecutor(max_workers=len(self.queries), thread_name_prefix="news-feed") as executor:
+            batches = list(executor.map(lambda q: self.news_tool.fetch_news(q, limit=5, conditional=True), self.queries))
+        
+        new_items = []
+        with self.lock:
+            for results in batches:
+                for res in results:
+                    self.fetched += 1
+                    keys = self._fingerprints(res)
+                    # Deduplicate based on title and link
+                    if not keys or any(key in self.seen for key in keys):
+                        self.duplicates += 1
+                        continue
+                    self._remember(keys)
+                    new_items.append({
                         "text": f"{res['content']} ({res['timestamp']})",
                         "source": "Google News RSS"
                     })
         
-        # Add new unique incidents to cache
-        self.cache.extend(new_incidents)
-        self.last_fetch = time.time()
-        return len(new_incidents)
+        # One batched extraction (and geocoding) pass for the whole refresh
+        if self.extractor and new_items:
+            try:
+                extracted = self.extractor([item["text"] for item in new_items])
+                for item, data in zip(new_items, extracted):
+                    item["extracted"] = data
+            except Exception as e:
+                print(f"News Feed Extraction Error: {e}")
+        
+        with self.lock:
+            for item in new_items:
+                if len(self.cache) == self.cache.maxlen:
+                    self.head += 1 # Oldest item falls out of the buffer
+                self.cache.append(item)
+            self.last_fetch = time.time()
+        return len(new_items)
+
+    def _pop(self):
+        """Next unconsumed item, or None. Called with the lock held."""
+        if self.cursor < self.head:
+            # The buffer wrapped before these items were consumed
+            self.dropped += self.head - self.cursor
+            self.cursor = self.head
+        if self.cursor < self.head + len(self.cache):
+            incident = self.cache[self.cursor - self.head]
+            self.cursor += 1
+            return incident
+        return None
 
     def get_next_incident(self):
-        """Returns the next incident from the cache, fetching more if needed."""
-        if time.time() - self.last_fetch > self.fetch_interval or not self.cache:
-            self.fetch_fresh_incidents()
-        
-        if self.current_index < len(self.cache):
-            incident = self.cache[self.current_index]
-            self.current_index += 1
+        """
+        Returns the next unseen incident from the buffer, or None. Never blocks on a
+        fetch; a stale or drained buffer schedules a background refresh instead.
+        """
+        self.start()
+        with self.lock:
+            incident = self._pop()
+            age = time.time() - self.last_fetch
+        # A refresh in flight will update last_fetch; waking it again would fetch twice
+        if self.refreshing:
             return incident
-        else:
-            # Wrap around or fetch more? For now, wrap around if empty, but try to fetch.
-            if self.fetch_fresh_incidents() == 0:
-                 # If no new news, just return the last one or loop
-                 if self.cache:
-                     self.current_index = 0
-                     return self.cache[0]
-            return None
+        # Stale relative to the refresh actually scheduled, so early wakes don't undo the jitter
+        if age > self.scheduled_delay or (incident is None and age > self.min_refresh_interval):
+            self.wake_event.set()
+        return incident
+
+    def start(self):
+        """Starts the background refresher (first refresh runs immediately)."""
+        if self.thread and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name="news-feed-refresher", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake_event.set()
+
+    def _next_delay(self):
+        return self.fetch_interval * random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            self.refreshing = True
+            # Wakes requested before this fetch are served by it; a failed fetch
+            # also counts, so errors back off instead of retrying on every call
+            self.wake_event.clear()
+            with self.lock:
+                self.last_fetch = time.time()
+            try:
+                self.fetch_fresh_incidents()
+            except Exception as e:
+                self.refresh_errors += 1
+                print(f"News Feed Refresh Error: {e}")
+            finally:
+                self.refreshing = False
+            self.scheduled_delay = self._next_delay()
+            self.wake_event.wait(self.scheduled_delay)
+            self.wake_event.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "buffered": self.head + len(self.cache) - max(self.cursor, self.head),
+                "fetched": self.fetched,
+                "duplicates": self.duplicates,
+                "dropped": self.dropped,
+                "last_fetch": self.last_fetch,
+                "refreshing": self.refreshing,
+                "refresh_errors": self.refresh_errors
+            }
@@ -1,6 +1,8 @@
-import requests
 import time
 import random
+from src.utils.http_client import http_get
+from src.utils.metrics import track_dependency
+from src.utils.rate_limiter import limiter
 
 class RedditTool:
     def __init__(self):
@@ -19,7 +21,9 @@ class RedditTool:
         headers = {"User-Agent": random.choice(self.user_agents)}
         
         try:
-            response = requests.get(url, headers=headers, timeout=5)
+            limiter.acquire("reddit")
+            with track_dependency("reddit"):
+                response = http_get(url, headers=headers)
             if response.status_code == 200:
                 data = response.json()
                 posts = []
@@ -0,0 +1,143 @@
+import csv
+import json
+import time
+import random
+import threading
+from datetime import datetime
+
+def _parse_timestamp(value):
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).strip()).timestamp()
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+def _read_file(path):
+    """Yields {"text", "source", "timestamp"} rows from a CSV or JSONL file."""
+    if path.endswith(".jsonl") or path.endswith(".ndjson"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                row = json.loads(line)
+                if row.get("text"):
+                    yield {"text": row["text"], "source": row.get("source", "replay"), "timestamp": row.get("timestamp")}
+    else:
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                if row.get("text"):
+                    yield {"text": row["text"], "source": row.get("source") or "replay", "timestamp": row.get("timestamp")}
+
+class ReplayFeed:
+    """
+    Replays a recorded corpus (CSV or JSONL files with text, source, timestamp columns)
+    into the pipeline, for mock mode and offline load tests.
+
+    Files are parsed once (or streamed lazily when preload=False and shuffle is off).
+
+    Args:
+        paths (list): Corpus files, replayed in order (or shuffled together).
+        rate: "max" to replay as fast as possible, "realtime" to follow the gaps in the
+            timestamp column (scaled by speed), or a number of items per second
+            (0 or less = "max").
+        speed (float): Realtime speed-up factor (e.g. 60 = one recorded minute per second).
+        shuffle (bool): Shuffle the corpus on each pass.
+        loop (bool): Start over when the corpus is exhausted.
+        seed (int): Seed for reproducible shuffles.
+        preload (bool): Load everything into memory up front.
+    """
+    def __init__(self, paths, rate="max", speed=1.0, shuffle=False, loop=True, seed=None, preload=True):
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        if rate not in ("max", "realtime"):
+            rate = float(rate)
+            if rate <= 0:
+                rate = "max"
+        self.rate = rate
+        self.speed = speed if speed and speed > 0 else 1.0
+        self.shuffle = shuffle
+        self.loop = loop
+        self.random = random.Random(seed)
+        self.preload = preload or shuffle
+        self.lock = threading.Lock()
+
+        self.items = None
+        if self.preload:
+            self.items = [row for path in self.paths for row in _read_file(path)]
+        self.emitted = 0
+        self.passes = 0
+        self._iterator = self._new_pass()
+
+        # Pacing state
+        self.next_due = None
+        self.last_timestamp = None
+
+    def _new_pass(self):
+        self.passes += 1
+        if self.items is not None:
+            order = list(self.items)
+            if self.shuffle:
+                self.random.shuffle(order)
+            return iter(order)
+        return (row for path in self.paths for row in _read_file(path))
+
+    def _next_row(self):
+        row = next(self._iterator, None)
+        if row is None and self.loop and (self.items is None or self.items):
+            self._iterator = self._new_pass()
+            self.last_timestamp = None # Don't wait for the gap between the end and the start
+            row = next(self._iterator, None)
+        return row
+
+    def _delay_for(self, row):
+        """Seconds to wait between the previous item and this one."""
+        if self.rate == "max":
+            return 0.0
+        if self.rate == "realtime":
+            ts = _parse_timestamp(row.get("timestamp"))
+            previous, self.last_timestamp = self.last_timestamp, ts
+            if ts is None or previous is None:
+                return 0.0
+            return max(0.0, ts - previous) / self.speed
+        return 1.0 / self.rate
+
+    def get_next_incident(self, wait=True):
+        """
+        Returns the next {"text", "source", "timestamp"} item, or None when the corpus
+        is exhausted (and loop is off).
+
+        Args:
+            wait (bool): Sleep until the item is due according to the replay rate.
+                Callers that pace themselves (e.g. the dashboard's /simulate loop) pass False.
+        """
+        with self.lock:
+            row = self._next_row()
+            if row is None:
+                return None
+            self.emitted += 1
+            now = time.monotonic()
+            due = (self.next_due or now) + self._delay_for(row)
+            # Never build up a backlog of "overdue" items after a stall
+            self.next_due = max(due, now)
+
+        if wait:
+            delay = self.next_due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return dict(row)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "files": self.paths,
+                "rate": self.rate,
+                "emitted": self.emitted,
+                "passes": self.passes,
+                "corpus_size": len(self.items) if self.items is not None else None
+            }
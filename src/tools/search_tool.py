@@ -1,5 +1,7 @@
 import os
-import requests
+from src.utils.http_client import http_get
+from src.utils.metrics import track_dependency
+from src.utils.rate_limiter import limiter
 
 class GoogleSearchTool:
     def __init__(self):
@@ -27,7 +29,9 @@ class GoogleSearchTool:
         }
 
         try:
-            response = requests.get(url, params=params, timeout=5)
+            limiter.acquire("google_custom_search")
+            with track_dependency("google_custom_search"):
+                response = http_get(url, params=params)
             if response.status_code == 200:
                 data = response.json()
                 results = []
@@ -1,26 +1,59 @@
-import requests
 import time
-from src.config import OPEN_WEATHER_API
+import threading
+from src.config import (
+    OPEN_WEATHER_API, WEATHER_TIMEOUT, WEATHER_CACHE_RESOLUTION_DEG, WEATHER_CACHE_TTL,
+    WEATHER_CACHE_SIZE, WEATHER_REFRESH_INTERVAL
+)
+from src.utils.cache import TTLCache, MISS
+from src.utils.http_client import http_get
+from src.utils.metrics import track_dependency
+from src.utils.rate_limiter import limiter, PRIORITY_NORMAL, PRIORITY_LOW
 
 class WeatherTool:
-    def __init__(self):
+    def __init__(self, resolution_deg=WEATHER_CACHE_RESOLUTION_DEG, ttl=WEATHER_CACHE_TTL):
         self.api_key = OPEN_WEATHER_API
         self.base_url = "https://api.openweathermap.org/data/2.5/weather"
+        # Reports from the same area share one reading: keyed on coordinates snapped to a grid
+        self.resolution_deg = resolution_deg
+        self.cache = TTLCache(max_entries=WEATHER_CACHE_SIZE, ttl=ttl, namespace="weather")
+
+    def _snap(self, lat, lon):
+        """Snaps coordinates to the center of their grid cell."""
+        res = self.resolution_deg
+        return round(round(lat / res) * res, 4), round(round(lon / res) * res, 4)
 
     def fetch_weather(self, lat, lon):
         """
         Fetches current weather data for a given latitude and longitude.
+        Served from the grid cache when a reading for the area is still fresh.
         """
         if not self.api_key:
             print("Warning: OPEN_WEATHER_API key not found.")
             return None
 
+        cell = self._snap(lat, lon)
+        cached = self.cache.get(cell)
+        if cached is not MISS:
+            return cached
+
+        return self.refresh(lat, lon)
+
+    def refresh(self, lat, lon, priority=PRIORITY_NORMAL):
+        """
+        Fetches weather for the grid cell containing (lat, lon), bypassing the cache, and stores it.
+        """
+        if not self.api_key:
+            return None
+
+        cell = self._snap(lat, lon)
         try:
-            url = f"{self.base_url}?lat={lat}&lon={lon}&appid={self.api_key}&units=metric"
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-            
+            url = f"{self.base_url}?lat={cell[0]}&lon={cell[1]}&appid={self.api_key}&units=metric"
+            limiter.acquire("openweather", priority=priority)
+            with track_dependency("openweather"):
+                response = http_get(url, timeout=WEATHER_TIMEOUT)
+                response.raise_for_status()
+                data = response.json()
+
             # Extract relevant current weather info (v2.5 structure)
             weather_desc = data.get("weather", [{}])[0].get("description", "Unknown")
             main = data.get("main", {})
@@ -28,19 +61,73 @@ class WeatherTool:
             humidity = main.get("humidity", "Unknown")
             wind = data.get("wind", {})
             wind_speed = wind.get("speed", "Unknown")
-            
+
             # v2.5 weather endpoint doesn't usually provide alerts in the same way as OneCall
             # We'll omit alerts for now or check if they exist in a different key if applicable
-            alert_summary = [] 
+            alert_summary = []
 
-            return {
+            weather = {
                 "description": weather_desc,
                 "temperature": f"{temp}°C",
                 "humidity": f"{humidity}%",
                 "wind_speed": f"{wind_speed} m/s",
                 "alerts": alert_summary
             }
+            self.cache.set(cell, weather)
+            return weather
 
         except Exception as e:
             print(f"Weather Fetch Error: {e}")
             return None
+
+class WeatherRefresher:
+    """
+    Background thread that keeps the WeatherTool cache warm for every active incident,
+    so VerifyAgent.verify doesn't block on OpenWeatherMap for a known area.
+
+    Args:
+        weather_tool (WeatherTool): The tool whose cache should be kept warm.
+        get_locations (callable): Returns the current list of [lat, lon] to cover.
+        interval (float): Seconds between refresh sweeps (keep below the cache TTL).
+    """
+    def __init__(self, weather_tool, get_locations, interval=WEATHER_REFRESH_INTERVAL):
+        self.weather_tool = weather_tool
+        self.get_locations = get_locations
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        if not self.weather_tool.api_key:
+            print("Warning: OPEN_WEATHER_API key not found. Weather refresher not started.")
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="weather-refresher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def refresh_once(self):
+        """Refreshes each distinct grid cell covered by the current locations once."""
+        cells = {}
+        for coords in list(self.get_locations()):
+            if coords:
+                cells.setdefault(self.weather_tool._snap(coords[0], coords[1]), coords)
+        for lat, lon in cells.values():
+            if self.stop_event.is_set():
+                break
+            # Cache warming yields to on-demand lookups from verification
+            self.weather_tool.refresh(lat, lon, priority=PRIORITY_LOW)
+        return len(cells)
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            start = time.time()
+            try:
+                self.refresh_once()
+            except Exception as e:
+                print(f"Weather Refresher Error: {e}")
+            self.stop_event.wait(max(0.0, self.interval - (time.time() - start)))
@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Sentinel returned on a cache miss, so that None can be cached as a negative result
+MISS = object()
+
+class DiskStore:
+    """
+    Small SQLite key/value store with per-entry expiry, shared by several caches via namespaces.
+    Values must be JSON-serializable.
+    """
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT, expires_at REAL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self.conn.commit()
+
+    def get(self, namespace, key):
+        """Returns (value, expires_at) or MISS if absent or expired."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            if row is None:
+                return MISS
+            value, expires_at = row
+            if expires_at is not None and expires_at <= time.time():
+                self.conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+                self.conn.commit()
+                return MISS
+        return json.loads(value), expires_at
+
+    def set(self, namespace, key, value, expires_at):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), expires_at)
+            )
+            self.conn.commit()
+
+    def clear(self, namespace):
+        with self.lock:
+            self.conn.execute("DELETE FROM cache WHERE namespace = ?", (namespace,))
+            self.conn.commit()
+
+    def purge_expired(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+            self.conn.commit()
+
+_disk_stores = {}
+_disk_stores_lock = threading.Lock()
+
+def get_disk_store(path):
+    """Returns the process-wide DiskStore for a path, opening it on first use."""
+    with _disk_stores_lock:
+        store = _disk_stores.get(path)
+        if store is None:
+            store = DiskStore(path)
+            _disk_stores[path] = store
+        return store
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and an optional SQLite tier.
+
+    The in-memory tier is bounded by max_entries (least recently used entries are
+    evicted first). When disk_path is set, entries are also written to disk and
+    misses in memory fall through to it, so the cache survives restarts.
+    """
+    def __init__(self, max_entries=1024, ttl=300, disk_path=None, namespace="default"):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.namespace = namespace
+        self.entries = OrderedDict() # key -> (expires_at, value)
+        self.lock = threading.Lock()
+        self.disk = None
+        if disk_path:
+            try:
+                self.disk = get_disk_store(disk_path)
+            except Exception as e:
+                print(f"Cache Warning: disk tier at {disk_path} unavailable ({e}). Using memory only.")
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns the cached value, or MISS."""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+
+        if self.disk is not None:
+            try:
+                found = self.disk.get(self.namespace, key)
+            except Exception as e:
+                print(f"Cache Warning: disk read failed ({e})")
+                found = MISS
+            if found is not MISS:
+                value, expires_at = found
+                with self.lock:
+                    self._store(key, value, expires_at)
+                    self.hits += 1
+                return value
+
+        with self.lock:
+            self.misses += 1
+        return MISS
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl else None
+        with self.lock:
+            self._store(key, value, expires_at)
+        if self.disk is not None:
+            try:
+                self.disk.set(self.namespace, key, value, expires_at)
+            except Exception as e:
+                print(f"Cache Warning: disk write failed ({e})")
+
+    def _store(self, key, value, expires_at):
+        self.entries[key] = (expires_at, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+        if self.disk is not None:
+            self.disk.clear(self.namespace)
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0
+            }
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,224 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from src.utils.metrics import STAGE_LATENCY
+
+class Stage:
+    """
+    One node of a stage graph.
+
+    Args:
+        name (str): Unique stage name (also the STAGE_LATENCY label and result key).
+        fn (callable): fn(results) -> value, where results maps finished stage names to values.
+        deps (tuple): Stages that must finish first.
+        when (callable): Optional when(results) -> bool; a False stage is skipped and yields `default`.
+        timeout (float): Seconds allowed once the stage starts running; only enforced
+            when the executor has a pool. An optional stage still queued after this
+            long is cancelled.
+        optional (bool): If True, a timeout or error yields `default` instead of failing the run.
+        default: Value for skipped (and failed optional) stages.
+    """
+    def __init__(self, name, fn, deps=(), when=None, timeout=None, optional=False, default=None):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.when = when
+        self.timeout = timeout
+        self.optional = optional
+        self.default = default
+
+class StageTimeout(Exception):
+    pass
+
+class RunCancelled(Exception):
+    """Raised by DagExecutor.run() once the executor is shutting down."""
+    pass
+
+class DagRun:
+    """Results and timing of one execution of a stage graph."""
+    def __init__(self):
+        self.results = {}
+        # name -> {"start_ms", "end_ms", "status"} (status: ok / skipped / timeout / error)
+        self.trace = {}
+        self.started = time.perf_counter()
+
+    def _mark(self, name, start, status):
+        self.trace[name] = {
+            "start_ms": round((start - self.started) * 1000, 2),
+            "end_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "status": status
+        }
+
+    def critical_path(self, stages):
+        """
+        Stage names on the critical path: from the stage that finished last, back
+        through the dependency that finished last at each step.
+        """
+        by_name = {stage.name: stage for stage in stages}
+        ran = {name: t for name, t in self.trace.items() if t["status"] != "skipped"}
+        if not ran:
+            return []
+        path = [max(ran, key=lambda name: ran[name]["end_ms"])]
+        while True:
+            deps = [dep for dep in by_name[path[-1]].deps if dep in ran]
+            if not deps:
+                break
+            path.append(max(deps, key=lambda dep: ran[dep]["end_ms"]))
+        return list(reversed(path))
+
+    def summary(self, stages):
+        path = self.critical_path(stages)
+        return {
+            "stages": dict(self.trace),
+            "critical_path": path,
+            "critical_path_ms": self.trace[path[-1]]["end_ms"] if path else 0.0
+        }
+
+class DagExecutor:
+    """
+    Runs a stage graph, starting each stage as soon as all of its dependencies are done.
+
+    Independent stages run concurrently on a shared thread pool (max_workers); with
+    max_workers=0 stages run inline in dependency order, which is useful for debugging
+    and as a baseline. A timed-out stage's thread cannot be interrupted; its result is
+    simply ignored. Optional stages with a timeout therefore run on their own pool
+    (optional_workers, default max_workers), so threads stuck in them cannot starve
+    the required stages.
+    """
+    def __init__(self, max_workers=8, optional_workers=None):
+        # In-flight runs, so shutdown() can let them finish
+        self.active = 0
+        self.closed = False
+        self.cond = threading.Condition()
+        self.pool = None
+        self.optional_pool = None
+        if max_workers > 0:
+            self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage")
+            self.optional_pool = ThreadPoolExecutor(
+                max_workers=optional_workers or max_workers, thread_name_prefix="stage-optional"
+            )
+
+    def _call(self, stage, results, started=None):
+        if started is not None:
+            started[stage.name] = time.perf_counter()
+        with STAGE_LATENCY.time(stage=stage.name):
+            return stage.fn(results)
+
+    def _finish(self, run, stage, start, status, value=None, error=None):
+        if status in ("timeout", "error") and not stage.optional:
+            run._mark(stage.name, start, status)
+            raise error if error else StageTimeout(f"Stage '{stage.name}' timed out after {stage.timeout}s")
+        if status in ("timeout", "error"):
+            print(f"Pipeline: Optional stage '{stage.name}' {status}: {error or stage.timeout}")
+        run.results[stage.name] = value if status == "ok" else stage.default
+        run._mark(stage.name, start, status)
+
+    def run(self, stages, results=None):
+        """
+        Executes the stages and returns a DagRun. Raises the error of the first
+        required stage that fails (StageTimeout if it timed out), or RunCancelled
+        if the executor is shut down before or during the run.
+        """
+        with self.cond:
+            if self.closed:
+                raise RunCancelled("Executor is shut down")
+            self.active += 1
+        try:
+            return self._run(stages, results)
+        finally:
+            with self.cond:
+                self.active -= 1
+                self.cond.notify_all()
+
+    def _run(self, stages, results):
+        run = DagRun()
+        run.results.update(results or {})
+        pending = list(stages)
+        running = {} # future -> (stage, submit time)
+        # Stage name -> time its callable began, set from the worker thread
+        started = {}
+
+        while pending or running:
+            # Start (or skip) every stage whose dependencies are all done
+            progressed = True
+            while progressed:
+                progressed = False
+                for stage in list(pending):
+                    if not all(dep in run.results for dep in stage.deps):
+                        continue
+                    pending.remove(stage)
+                    progressed = True
+                    start = time.perf_counter()
+                    if stage.when and not stage.when(run.results):
+                        self._finish(run, stage, start, "skipped")
+                    elif self.pool is None:
+                        try:
+                            value = self._call(stage, run.results)
+                        except Exception as e:
+                            self._finish(run, stage, start, "error", error=e)
+                        else:
+                            self._finish(run, stage, start, "ok", value)
+                    else:
+                        pool = self.optional_pool if stage.optional and stage.timeout is not None else self.pool
+                        try:
+                            future = pool.submit(self._call, stage, dict(run.results), started)
+                        except RuntimeError:
+                            # The pools were released before this run drained
+                            raise RunCancelled(f"Executor shut down before stage '{stage.name}'") from None
+                        running[future] = (stage, start)
+
+            if not running:
+                if pending:
+                    missing = sorted({dep for stage in pending for dep in stage.deps} - set(run.results))
+                    raise ValueError(f"Unsatisfiable stage dependencies: {missing}")
+                break
+
+            # Wait for the next completion or the nearest deadline
+            now = time.perf_counter()
+            deadlines = [self._deadline(stage, start, started) for stage, start in running.values()]
+            deadlines = [deadline for deadline in deadlines if deadline is not None]
+            wait_for = max(0.0, min(deadlines) - now) if deadlines else None
+            done, _ = wait(list(running), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                stage, start = running.pop(future)
+                start = started.get(stage.name, start)
+                error = future.exception()
+                if error is not None:
+                    self._finish(run, stage, start, "error", error=error)
+                else:
+                    self._finish(run, stage, start, "ok", future.result())
+
+            now = time.perf_counter()
+            for future, (stage, start) in list(running.items()):
+                deadline = self._deadline(stage, start, started)
+                if deadline is None or now < deadline:
+                    continue
+                # A queued stage is cancelled; one that just began gets its full timeout
+                if stage.name not in started and not future.cancel():
+                    continue
+                del running[future]
+                self._finish(run, stage, started.get(stage.name, start), "timeout")
+        return run
+
+    @staticmethod
+    def _deadline(stage, submitted, started):
+        if stage.timeout is None:
+            return None
+        if stage.name in started:
+            return started[stage.name] + stage.timeout
+        # Only optional stages give up while still queued
+        return submitted + stage.timeout if stage.optional else None
+
+    def shutdown(self, timeout=None):
+        """
+        Stops accepting runs and waits up to timeout seconds for in-flight runs to
+        finish before releasing the pools. Runs still going after that raise
+        RunCancelled at their next stage; threads stuck in abandoned stages are not waited on.
+        """
+        with self.cond:
+            self.closed = True
+            self.cond.wait_for(lambda: self.active == 0, timeout=timeout)
+        if self.pool:
+            self.pool.shutdown(wait=False)
+            self.optional_pool.shutdown(wait=False)
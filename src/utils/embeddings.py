@@ -0,0 +1,84 @@
+import re
+import hashlib
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def _stable_hash(feature):
+    # Python's built-in hash() is salted per process, so use a fixed digest instead
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+
+class HashingEmbedder:
+    """
+    Deterministic, offline text embedder.
+
+    Words, word bigrams and character n-grams are hashed into a fixed-size signed
+    vector (the "hashing trick") and L2-normalized. No model or network access is
+    needed. Offline/test use only: it measures word overlap, not meaning, so the
+    MemoryAgent does not use it to skip the LLM similarity check.
+    """
+    name = "local"
+
+    def __init__(self, dim=512, char_ngrams=(3, 4)):
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+
+    def _features(self, text):
+        words = _TOKEN_RE.findall(text.lower())
+        features = list(words)
+        features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+        for word in words:
+            padded = f"<{word}>"
+            for n in self.char_ngrams:
+                features.extend(f"#{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+        return features
+
+    def embed(self, text):
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text or ""):
+            h = _stable_hash(feature)
+            sign = 1.0 if (h >> 63) & 1 else -1.0
+            vec[h % self.dim] += sign
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec /= norm
+        return vec
+
+class GeminiEmbedder:
+    """
+    Embeds text with the Gemini embedding API.
+    Returns None on failure so callers can fall back to the LLM similarity check.
+    """
+    name = "gemini"
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def embed(self, text):
+        import google.generativeai as genai
+        from src.utils.rate_limiter import handle_rate_limit, limiter
+        from src.utils.metrics import track_dependency
+
+        for attempt in range(3):
+            try:
+                limiter.acquire("gemini_embedding")
+                with track_dependency("gemini_embedding"):
+                    result = genai.embed_content(model=self.model_name, content=text or " ", task_type="semantic_similarity")
+                vec = np.asarray(result["embedding"], dtype=np.float32)
+                norm = np.linalg.norm(vec)
+                return vec / norm if norm > 0 else vec
+            except Exception as e:
+                if handle_rate_limit(e, "gemini_embedding"):
+                    continue
+                print(f"Embedding Error: {e}")
+                return None
+        return None
+
+def cosine_scores(query_vec, matrix):
+    """
+    Cosine similarity of one L2-normalized vector against each row of an
+    L2-normalized matrix, in a single vectorized product.
+    """
+    if matrix.size == 0:
+        return np.zeros(0, dtype=np.float32)
+    return matrix @ query_vec
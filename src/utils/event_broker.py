@@ -0,0 +1,93 @@
+import json
+import asyncio
+import threading
+from collections import deque
+
+class Subscriber:
+    """
+    One connected client. Events are buffered in a bounded deque; when a slow
+    client falls behind, the oldest events are dropped and the client is told to resync.
+    """
+    def __init__(self, loop, buffer_size):
+        self.loop = loop
+        self.buffer = deque(maxlen=buffer_size)
+        self.lock = threading.Lock()
+        self.ready = asyncio.Event()
+        self.dropped = 0
+
+    def push(self, message):
+        with self.lock:
+            if len(self.buffer) == self.buffer.maxlen:
+                self.dropped += 1
+            self.buffer.append(message)
+        try:
+            self.loop.call_soon_threadsafe(self.ready.set)
+        except RuntimeError:
+            pass # Event loop already closed
+
+    def drain(self):
+        """Returns (messages, dropped_count) and clears the buffer."""
+        with self.lock:
+            messages = list(self.buffer)
+            self.buffer.clear()
+            dropped, self.dropped = self.dropped, 0
+            self.ready.clear()
+        return messages, dropped
+
+class EventBroker:
+    """
+    Fans out server events to Server-Sent Events subscribers.
+
+    publish() is thread-safe and never blocks (it is called from ingestion workers
+    and MemoryAgent.consolidate). Each event is serialized once, not once per subscriber.
+    """
+    def __init__(self, buffer_size=256, heartbeat_seconds=15.0):
+        self.buffer_size = buffer_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.published = 0
+
+    def publish(self, event, data):
+        message = f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        with self.lock:
+            subscribers = list(self.subscribers)
+            self.published += 1
+        for subscriber in subscribers:
+            subscriber.push(message)
+
+    def subscribe(self):
+        subscriber = Subscriber(asyncio.get_running_loop(), self.buffer_size)
+        with self.lock:
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    async def stream(self, is_disconnected):
+        """
+        Async generator of SSE frames for one client, until is_disconnected() returns True.
+        """
+        subscriber = self.subscribe()
+        try:
+            yield "retry: 3000\n\n"
+            while not await is_disconnected():
+                try:
+                    await asyncio.wait_for(subscriber.ready.wait(), timeout=self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                messages, dropped = subscriber.drain()
+                if dropped:
+                    # The client missed events; it should refetch a full snapshot
+                    yield f"event: resync\ndata: {json.dumps({'dropped': dropped})}\n\n"
+                for message in messages:
+                    yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self):
+        with self.lock:
+            return {"subscribers": len(self.subscribers), "published": self.published}
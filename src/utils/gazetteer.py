@@ -0,0 +1,219 @@
+import os
+import csv
+import math
+import threading
+from collections import deque
+from src.config import GAZETTEER_PATH
+
+# Most specific first when a text names several places ("Shinjuku, Tokyo, Japan")
+FEATURE_RANK = {"landmark": 4, "district": 3, "city": 2, "region": 1, "country": 0}
+
+# Words an address may contain besides place names and still be resolved offline
+_GENERIC_WORDS = frozenset(
+    "city town village district area region state province prefecture county near in of the and".split()
+)
+
+# Score bonus for a candidate whose country (or, doubled, admin1 region) is also named in the text
+CONTEXT_BONUS = 10.0
+
+class Place:
+    __slots__ = ("name", "coordinates", "feature", "country_code", "admin1", "population")
+
+    def __init__(self, name, coordinates, feature, country_code, admin1, population):
+        self.name = name
+        self.coordinates = coordinates
+        self.feature = feature
+        self.country_code = country_code
+        self.admin1 = admin1
+        self.population = population
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "coordinates": list(self.coordinates),
+            "feature": self.feature,
+            "country_code": self.country_code,
+            "admin1": self.admin1,
+            "population": self.population
+        }
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch in "'’"
+
+def _ends_word(text, i):
+    """Whether a name ending before text[i] ends a word; a possessive "'s" counts as an ending."""
+    if i >= len(text) or not _is_word_char(text[i]):
+        return True
+    # "Mumbai's streets", "Tokyo’s subway"
+    return text[i] in "'’" and text[i + 1:i + 2] == "s" and (i + 2 >= len(text) or not _is_word_char(text[i + 2]))
+
+class Gazetteer:
+    """
+    Offline place index built from a GeoNames-style TSV (name, alternatenames,
+    latitude, longitude, feature, country_code, admin1, population).
+
+    All names and alternate names are compiled into one Aho-Corasick automaton, so
+    finding every place mentioned in a text is a single pass over its characters.
+    Names shared by several places (Paris, Springfield) are resolved by context
+    (the country or admin1 region is named too) and then by population.
+    """
+    def __init__(self, places=()):
+        # Automaton: per state, char -> next state; failure links; names ending there
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        # Lowercased name -> places carrying it
+        self.places = {}
+        for place, names in places:
+            self._add(place, names)
+        self._build()
+
+    @classmethod
+    def load(cls, path):
+        entries = []
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f, delimiter="\t"):
+                place = Place(
+                    name=row["name"],
+                    coordinates=(float(row["latitude"]), float(row["longitude"])),
+                    feature=row["feature"],
+                    country_code=row["country_code"],
+                    admin1=row.get("admin1") or "",
+                    population=int(row.get("population") or 0)
+                )
+                names = [row["name"]] + [n.strip() for n in (row.get("alternatenames") or "").split(",") if n.strip()]
+                entries.append((place, names))
+        return cls(entries)
+
+    def _add(self, place, names):
+        for name in names:
+            key = name.lower()
+            self.places.setdefault(key, []).append(place)
+            state = 0
+            for ch in key:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][ch] = nxt
+                state = nxt
+            if key not in self.output[state]:
+                self.output[state].append(key)
+
+    def _build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                if state:
+                    fallback = self.fail[state]
+                    while fallback and ch not in self.goto[fallback]:
+                        fallback = self.fail[fallback]
+                    self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def find(self, text):
+        """
+        Place names in the text as (start, end, name) spans, leftmost-longest and
+        non-overlapping, matched on whole words and case-insensitively.
+        """
+        lowered = (text or "").lower()
+        matches = []
+        state = 0
+        for i, ch in enumerate(lowered):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for key in self.output[state]:
+                start = i - len(key) + 1
+                if start > 0 and _is_word_char(lowered[start - 1]):
+                    continue
+                if not _ends_word(lowered, i + 1):
+                    continue
+                matches.append((start, i + 1, key))
+
+        matches.sort(key=lambda m: (m[0], m[0] - m[1]))
+        spans = []
+        last_end = 0
+        for start, end, key in matches:
+            if start >= last_end:
+                spans.append((start, end, key))
+                last_end = end
+        return spans
+
+    def _disambiguate(self, key, context):
+        def score(place):
+            bonus = 0.0
+            if place.admin1.lower() in context:
+                bonus += 2 * CONTEXT_BONUS
+            if place.country_code in context:
+                bonus += CONTEXT_BONUS
+            return bonus + math.log10(place.population + 1)
+        return max(self.places[key], key=score)
+
+    def _context(self, keys):
+        # Country codes and lowercased region names the text mentions
+        context = set(keys)
+        for key in keys:
+            for place in self.places[key]:
+                if place.feature in ("country", "region"):
+                    context.add(place.country_code)
+        return context
+
+    def resolve(self, text):
+        """The most specific place the text names, or None."""
+        spans = self.find(text)
+        if not spans:
+            return None
+        keys = [key for _, _, key in spans]
+        context = self._context(keys)
+        candidates = [self._disambiguate(key, context - {key}) for key in keys]
+        # Most specific feature wins; ties go to the first mention
+        return max(enumerate(candidates), key=lambda c: (FEATURE_RANK.get(c[1].feature, 0), -c[0]))[1]
+
+    def resolve_address(self, address):
+        """
+        Like resolve(), but only when the address is nothing but place names (plus
+        punctuation and generic words like "city"), e.g. "Shinjuku, Tokyo". Addresses
+        with streets or other detail ("5th and Elm, Los Angeles") return None so a
+        real geocoder can place them precisely.
+        """
+        spans = self.find(address)
+        if not spans:
+            return None
+        lowered = address.lower()
+        rest = []
+        last_end = 0
+        for start, end, _ in spans:
+            rest.append(lowered[last_end:start])
+            last_end = end
+        rest.append(lowered[last_end:])
+        words = "".join(ch if _is_word_char(ch) else " " for ch in " ".join(rest)).split()
+        if any(word not in _GENERIC_WORDS for word in words):
+            return None
+        return self.resolve(address)
+
+    def stats(self):
+        return {"names": len(self.places), "states": len(self.goto)}
+
+_gazetteer = None
+_lock = threading.Lock()
+
+def get_gazetteer():
+    """Process-wide gazetteer loaded from GAZETTEER_PATH, or None if it is unset or missing."""
+    global _gazetteer
+    if _gazetteer is None:
+        with _lock:
+            if _gazetteer is None:
+                if not GAZETTEER_PATH or not os.path.exists(GAZETTEER_PATH):
+                    _gazetteer = False
+                else:
+                    try:
+                        _gazetteer = Gazetteer.load(GAZETTEER_PATH)
+                    except Exception as e:
+                        print(f"Gazetteer Error: {e}")
+                        _gazetteer = False
+    return _gazetteer or None
@@ -0,0 +1,43 @@
+import threading
+from src.config import GOOGLE_API_KEY, GEMINI_MODEL_NAME
+
+_lock = threading.Lock()
+_configured = False
+_models = {}
+_search_client = None
+
+def get_model(model_name=GEMINI_MODEL_NAME):
+    """
+    Returns the shared google.generativeai GenerativeModel for `model_name`,
+    or None when no API key is configured. genai.configure runs once per process.
+    """
+    global _configured
+    if not GOOGLE_API_KEY:
+        return None
+    with _lock:
+        model = _models.get(model_name)
+        if model is None:
+            import google.generativeai as genai
+            if not _configured:
+                genai.configure(api_key=GOOGLE_API_KEY)
+                _configured = True
+            model = genai.GenerativeModel(model_name)
+            _models[model_name] = model
+        return model
+
+def get_search_client():
+    """
+    Returns the shared google.genai (V2 SDK) Client used for grounded search,
+    or None when the SDK is not installed or no API key is configured.
+    """
+    global _search_client
+    if not GOOGLE_API_KEY:
+        return None
+    with _lock:
+        if _search_client is None:
+            try:
+                from google import genai
+            except ImportError:
+                return None
+            _search_client = genai.Client(api_key=GOOGLE_API_KEY)
+        return _search_client
@@ -0,0 +1,52 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.config import HTTP_TIMEOUT, HTTP_POOL_HOSTS, HTTP_POOL_PER_HOST, HTTP_RETRIES, HTTP_RETRY_BACKOFF
+
+_session = None
+_session_lock = threading.Lock()
+
+def _build_session():
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_RETRY_BACKOFF,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False # Hand the last response back so tools keep their status-code handling
+    )
+    # pool_block caps concurrent connections per host instead of opening throwaway extras
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_HOSTS,
+        pool_maxsize=HTTP_POOL_PER_HOST,
+        max_retries=retry,
+        pool_block=True
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_session():
+    """
+    Returns the process-wide requests.Session.
+    Keep-alive connections (and their TLS sessions) are reused across tools and threads.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+def http_get(url, timeout=HTTP_TIMEOUT, **kwargs):
+    """Drop-in for requests.get() over the shared, pooled session."""
+    return get_session().get(url, timeout=timeout, **kwargs)
+
+def close_session():
+    """Closes pooled connections (called on shutdown)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
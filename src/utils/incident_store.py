@@ -0,0 +1,301 @@
+import os
+import json
+import math
+import sqlite3
+import threading
+from src.config import INCIDENT_REPORT_HISTORY, INCIDENT_ARCHIVE_SIZE
+from src.incident import Incident
+
+class InMemoryIncidentStore:
+    """
+    Default backend: incidents live only in the MemoryAgent.
+    Keeps references so query() works the same as the SQLite backend. Reports pushed
+    out of an incident's history are appended to a JSONL archive file (if configured).
+    Nothing survives the store, so a new store always starts empty.
+    """
+    name = "memory"
+    # Whether a new store on the same path loads back what this one saved
+    durable = False
+
+    def __init__(self, archive_path=None):
+        self.incidents = {}
+        self.archive_path = archive_path or None
+        self.archived_reports = 0
+        self.lock = threading.Lock()
+        if self.archive_path:
+            directory = os.path.dirname(self.archive_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Incident ids restart at 1 every process, so a previous run's archive would
+            # attach its reports to unrelated incidents
+            open(self.archive_path, "w").close()
+
+    def load(self):
+        """Returns (incidents oldest change first, next_id, version)."""
+        return [], 1, 0
+
+    def save(self, action, incident, report, next_id, version):
+        self.incidents[incident.id] = incident
+
+    def update(self, incidents, version):
+        pass # Holds the live objects already
+
+    def archive_reports(self, incident_id, reports):
+        with self.lock:
+            self.archived_reports += len(reports)
+            if not self.archive_path:
+                return
+            with open(self.archive_path, "a", encoding="utf-8") as f:
+                for report in reports:
+                    f.write(json.dumps({"incident_id": incident_id, "report": report}, default=str) + "\n")
+
+    def report_history(self, incident_id):
+        """Archived reports of an incident, oldest first (scans the archive file)."""
+        if not self.archive_path or not os.path.exists(self.archive_path):
+            return []
+        reports = []
+        with self.lock, open(self.archive_path, encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry["incident_id"] == incident_id:
+                    reports.append(entry["report"])
+        return reports
+
+    def evict(self, incident_ids):
+        """Forgets archived incidents the MemoryAgent no longer holds (nothing else keeps them)."""
+        for incident_id in incident_ids:
+            self.incidents.pop(incident_id, None)
+
+    def query(self, incident_type=None, updated_after=None, bbox=None, limit=None, status=None):
+        """Ids of incidents matching every given filter, most recently updated first."""
+        matches = []
+        for incident in self.incidents.values():
+            if status and incident.status != status:
+                continue
+            if incident_type and incident.type != incident_type:
+                continue
+            if updated_after and incident.last_updated <= updated_after:
+                continue
+            if bbox:
+                lat, lon = incident.coordinates
+                if not (bbox[0] <= lat <= bbox[2] and bbox[1] <= lon <= bbox[3]):
+                    continue
+            matches.append(incident)
+        matches.sort(key=lambda i: i.last_updated, reverse=True)
+        return [i.id for i in matches[:limit]]
+
+    def clear(self):
+        self.incidents.clear()
+        with self.lock:
+            if self.archive_path and os.path.exists(self.archive_path):
+                os.remove(self.archive_path)
+
+    def close(self):
+        pass
+
+    def stats(self):
+        return {"backend": self.name, "incidents": len(self.incidents), "archived_reports": self.archived_reports}
+
+class SQLiteIncidentStore:
+    """
+    Durable incident store in a single SQLite file (WAL mode).
+
+    Incidents and their reports are separate tables, so a merge appends one report row
+    instead of rewriting the whole incident. Each create/merge is one transaction.
+    Incidents are indexed by type, last_updated, version and grid cell (same 0.01°
+    cells as the MemoryAgent's SpatialIndex) for queries without a full scan.
+    Every report stays in the reports table, which doubles as the report archive;
+    only each incident's recent history is loaded back into memory. Archived incidents
+    keep their rows (status = 'archived') and only the most recent ones are reloaded.
+    """
+    name = "sqlite"
+    durable = True
+
+    def __init__(self, path, cell_size_deg=0.01):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.cell_size_deg = cell_size_deg
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS incidents ("
+            " id INTEGER PRIMARY KEY, type TEXT NOT NULL, severity TEXT, confidence REAL,"
+            " lat REAL, lon REAL, lat_cell INTEGER, lon_cell INTEGER,"
+            " created_at TEXT, last_updated TEXT, version INTEGER NOT NULL, data TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_incidents_type ON incidents (type);"
+            "CREATE INDEX IF NOT EXISTS idx_incidents_last_updated ON incidents (last_updated);"
+            "CREATE INDEX IF NOT EXISTS idx_incidents_version ON incidents (version);"
+            "CREATE INDEX IF NOT EXISTS idx_incidents_cell ON incidents (lat_cell, lon_cell);"
+            "CREATE TABLE IF NOT EXISTS reports ("
+            " incident_id INTEGER NOT NULL, seq INTEGER NOT NULL, data TEXT NOT NULL,"
+            " PRIMARY KEY (incident_id, seq));"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);"
+        )
+        # Databases created before incident archival have no status column
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(incidents)")}
+        if "status" not in columns:
+            self.conn.execute("ALTER TABLE incidents ADD COLUMN status TEXT NOT NULL DEFAULT 'active'")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_incidents_status ON incidents (status, version)")
+        self.conn.commit()
+
+    def _cell(self, value):
+        return int(math.floor(value / self.cell_size_deg))
+
+    def _incident_row(self, incident):
+        lat, lon = incident.coordinates
+        return (
+            incident.id, incident.type, incident.severity, incident.confidence,
+            lat, lon, self._cell(lat), self._cell(lon),
+            incident.created_at, incident.last_updated, incident.version, incident.status,
+            json.dumps(incident.state(), default=str)
+        )
+
+    def load(self, history=INCIDENT_REPORT_HISTORY, archived=INCIDENT_ARCHIVE_SIZE):
+        """
+        Returns (incidents oldest change first, next_id, version): every active incident
+        plus the `archived` most recently archived ones. Two sequential scans (incidents,
+        then the recent reports in key order) so warm start stays fast however long the
+        report history is.
+        """
+        incidents = []
+        by_id = {}
+        with self.lock:
+            meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+            for row in self.conn.execute(
+                "SELECT id, type, severity, confidence, created_at, last_updated, version, status, data"
+                " FROM incidents WHERE status = 'active' OR id IN"
+                " (SELECT id FROM incidents WHERE status = 'archived' ORDER BY version DESC LIMIT ?)"
+                " ORDER BY version",
+                (archived,)
+            ):
+                state = json.loads(row[8])
+                incident = Incident(
+                    id=row[0], type=row[1], severity=row[2], confidence=row[3],
+                    created_at=row[4], last_updated=row[5], version=row[6], status=row[7], **state
+                )
+                incidents.append(incident)
+                by_id[incident.id] = incident
+            for incident_id, data in self.conn.execute(
+                "SELECT r.incident_id, r.data FROM reports r"
+                " WHERE r.seq >= (SELECT MAX(seq) FROM reports WHERE incident_id = r.incident_id) - ?"
+                " ORDER BY r.incident_id, r.seq",
+                (history - 1,)
+            ):
+                incident = by_id.get(incident_id)
+                if incident is not None:
+                    incident.reports.append(json.loads(data))
+
+        next_id = max(meta.get("next_id", 1), max(by_id, default=0) + 1)
+        version = max(meta.get("version", 0), incidents[-1].version if incidents else 0)
+        return incidents, next_id, version
+
+    def _upsert(self, incident):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO incidents"
+            " (id, type, severity, confidence, lat, lon, lat_cell, lon_cell, created_at, last_updated, version, status, data)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            self._incident_row(incident)
+        )
+
+    def save(self, action, incident, report, next_id, version):
+        """
+        Persists one consolidation: the incident row, the new report and the counters,
+        atomically. `report` is the report that was just added (the first one on create).
+        """
+        with self.lock, self.conn:
+            self._upsert(incident)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO reports (incident_id, seq, data) VALUES (?, ?, ?)",
+                (incident.id, incident.report_count - 1, json.dumps(incident.reports[-1], default=str))
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (("next_id", next_id), ("version", version))
+            )
+
+    def update(self, incidents, version):
+        """Persists changed incident rows (e.g. status) and the version counter in one transaction."""
+        with self.lock, self.conn:
+            for incident in incidents:
+                self._upsert(incident)
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (version,))
+
+    def archive_reports(self, incident_id, reports):
+        pass # Already in the reports table
+
+    def report_history(self, incident_id):
+        """Every stored report of an incident, oldest first."""
+        with self.lock:
+            return [
+                json.loads(data) for (data,) in self.conn.execute(
+                    "SELECT data FROM reports WHERE incident_id = ? ORDER BY seq", (incident_id,)
+                )
+            ]
+
+    def evict(self, incident_ids):
+        pass # Archived rows stay on disk
+
+    def query(self, incident_type=None, updated_after=None, bbox=None, limit=None, status=None):
+        """
+        Ids of incidents matching every given filter, most recently updated first.
+
+        Args:
+            incident_type (str): Exact incident type.
+            updated_after (str): ISO timestamp; only incidents updated later.
+            bbox (tuple): (min_lat, min_lon, max_lat, max_lon).
+            limit (int): Maximum ids to return.
+            status (str): "active" or "archived" (default: both).
+        """
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if incident_type:
+            clauses.append("type = ?")
+            params.append(incident_type)
+        if updated_after:
+            clauses.append("last_updated > ?")
+            params.append(updated_after)
+        if bbox:
+            # Cell range narrows the search via the index; exact bounds filter the edges
+            clauses.append("lat_cell BETWEEN ? AND ? AND lon_cell BETWEEN ? AND ?")
+            params.extend([self._cell(bbox[0]), self._cell(bbox[2]), self._cell(bbox[1]), self._cell(bbox[3])])
+            clauses.append("lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?")
+            params.extend([bbox[0], bbox[2], bbox[1], bbox[3]])
+        sql = "SELECT id FROM incidents"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY last_updated DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self.lock:
+            return [row[0] for row in self.conn.execute(sql, params)]
+
+    def clear(self):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM reports")
+            self.conn.execute("DELETE FROM incidents")
+            self.conn.execute("DELETE FROM meta")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def stats(self):
+        with self.lock:
+            incidents = self.conn.execute("SELECT COUNT(*) FROM incidents").fetchone()[0]
+            reports = self.conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+        return {"backend": self.name, "path": self.path, "incidents": incidents, "reports": reports}
+
+def create_incident_store(backend, path=None, archive_path=None):
+    """Builds the incident store for a backend name ("memory" or "sqlite")."""
+    if backend == "sqlite":
+        return SQLiteIncidentStore(path)
+    if backend != "memory":
+        print(f"Warning: Unknown INCIDENT_STORE '{backend}', using in-memory store.")
+    return InMemoryIncidentStore(archive_path)
@@ -0,0 +1,96 @@
+import json
+import hashlib
+import threading
+from src.config import CACHE_DB_PATH, LLM_CACHE_ENABLED, LLM_CACHE_SIZE, LLM_CACHE_DISK, LLM_CACHE_TTLS
+from src.utils.cache import TTLCache, MISS
+from src.utils.metrics import track_dependency
+from src.utils.rate_limiter import limiter, gemini_key, PRIORITY_NORMAL
+
+class LLMCache:
+    """
+    Content-addressed cache in front of Gemini calls, shared by all agents.
+
+    Entries are keyed by (model, prompt hash, tool config). Each agent gets its own
+    TTLCache so TTLs and hit/miss counters are tracked per agent. Only successful
+    responses are stored; errors propagate to the caller's retry loop untouched.
+    """
+    def __init__(self, enabled=LLM_CACHE_ENABLED, max_entries=LLM_CACHE_SIZE, ttls=LLM_CACHE_TTLS,
+                 disk_path=CACHE_DB_PATH if LLM_CACHE_DISK else None):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttls = dict(ttls)
+        self.disk_path = disk_path
+        self.caches = {}
+        self.lock = threading.Lock()
+
+    def _cache_for(self, agent):
+        with self.lock:
+            cache = self.caches.get(agent)
+            if cache is None:
+                cache = TTLCache(
+                    max_entries=self.max_entries,
+                    ttl=self.ttls.get(agent, 600),
+                    disk_path=self.disk_path,
+                    namespace=f"llm:{agent}"
+                )
+                self.caches[agent] = cache
+            return cache
+
+    @staticmethod
+    def make_key(model_name, prompt, tool_config=None):
+        payload = json.dumps([model_name, prompt, tool_config], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, agent, key):
+        if not self.enabled:
+            return MISS
+        return self._cache_for(agent).get(key)
+
+    def set(self, agent, key, value):
+        if self.enabled:
+            self._cache_for(agent).set(key, value)
+
+    def generate(self, model, prompt, agent, parse=None, tool_config=None, priority=PRIORITY_NORMAL):
+        """
+        Returns model.generate_content(prompt).text, served from cache when possible.
+
+        Args:
+            model: A google.generativeai GenerativeModel.
+            prompt (str): The full prompt.
+            agent (str): Cache partition ("extract", "scout", "verify", "memory", ...).
+            parse (callable): Optional parser applied to the text. The response is only
+                cached if parsing succeeds, and the parsed value is returned.
+            tool_config: Anything that changes the response for the same prompt.
+            priority (int): Rate limiter priority for cache misses.
+        """
+        model_name = getattr(model, "model_name", None) or str(model)
+        key = self.make_key(model_name, prompt, tool_config)
+
+        cached = self.get(agent, key)
+        if cached is not MISS:
+            return parse(cached) if parse else cached
+
+        # Cache misses wait for quota on the shared per-model token bucket
+        limiter_key = gemini_key(model_name)
+        limiter.acquire(limiter_key, tokens=len(prompt) // 4, priority=priority)
+        with track_dependency("gemini"):
+            text = model.generate_content(prompt).text
+        limiter.record_success(limiter_key)
+        result = parse(text) if parse else text
+        self.set(agent, key, text)
+        return result
+
+    def clear(self):
+        with self.lock:
+            caches = list(self.caches.values())
+        for cache in caches:
+            cache.clear()
+
+    def stats(self):
+        """Per-agent hit/miss counters."""
+        with self.lock:
+            caches = dict(self.caches)
+        return {agent: cache.stats() for agent, cache in caches.items()}
+
+# Process-wide cache shared by all agents
+llm_cache = LLMCache()
@@ -1,22 +1,234 @@
 import time
 import re
+import heapq
+import asyncio
 import logging
+import itertools
+import threading
+from collections import deque
+from src.config import GEMINI_MODEL_NAME, RATE_LIMITER_ENABLED, RATE_LIMITS
+from src.utils.metrics import RATE_LIMIT_RETRIES, RATE_LIMIT_SLEEP_SECONDS
 
-def handle_rate_limit(e):
+# Request priorities (lower runs first when callers are queued on the same limit)
+PRIORITY_HIGH = 0   # On the critical path of an item (extract, verify)
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2    # Background work (cache warming, proactive search)
+
+def gemini_key(model_name=GEMINI_MODEL_NAME):
+    """Limiter key for a Gemini model ("models/x" and "x" share a bucket)."""
+    return f"gemini:{model_name.split('/')[-1]}"
+
+class _Limit:
+    """
+    Token buckets for one key: requests per minute and (optionally) tokens per minute.
+
+    Buckets hold up to 15s worth of quota so short bursts pass through while sustained
+    load is smoothed to the configured rate. A 429 blocks the key until its retry hint
+    expires and scales the rate down; successes slowly scale it back up.
+    """
+    BURST_SECONDS = 15.0
+
+    def __init__(self, rpm=0, tpm=0):
+        self.rpm = rpm or 0
+        self.tpm = tpm or 0
+        self.scale = 1.0
+        self.blocked_until = 0.0
+        now = time.monotonic()
+        self.request_tokens = self._capacity(self.rpm)
+        self.token_tokens = self._capacity(self.tpm)
+        self.updated = now
+        self.recent = deque() # Request times over the last minute, to learn a limit for unlimited keys
+
+    def _capacity(self, per_minute):
+        return max(1.0, per_minute * self.BURST_SECONDS / 60.0) if per_minute else 0.0
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        self.updated = now
+        if self.rpm:
+            self.request_tokens = min(self._capacity(self.rpm), self.request_tokens + elapsed * self.rpm * self.scale / 60.0)
+        if self.tpm:
+            self.token_tokens = min(self._capacity(self.tpm), self.token_tokens + elapsed * self.tpm * self.scale / 60.0)
+
+    def reserve(self, tokens, now):
+        """Takes quota and returns 0, or returns the seconds to wait before trying again."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+
+        wait = 0.0
+        if self.rpm and self.request_tokens < 1.0:
+            wait = max(wait, (1.0 - self.request_tokens) * 60.0 / (self.rpm * self.scale))
+        if self.tpm:
+            tokens = min(tokens, self._capacity(self.tpm))
+            if self.token_tokens < tokens:
+                wait = max(wait, (tokens - self.token_tokens) * 60.0 / (self.tpm * self.scale))
+        if wait > 0:
+            return wait
+
+        if self.rpm:
+            self.request_tokens -= 1.0
+        if self.tpm:
+            self.token_tokens -= tokens
+        self.recent.append(now)
+        while self.recent and self.recent[0] < now - 60.0:
+            self.recent.popleft()
+        return 0.0
+
+    def penalize(self, retry_after, now):
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+        if not self.rpm:
+            # No configured limit: learn one slightly below the rate that triggered the 429
+            self.rpm = max(1, int(len(self.recent) * 0.8))
+            self.request_tokens = 0.0
+        self.scale = max(0.25, self.scale * 0.7)
+
+    def record_success(self):
+        self.scale = min(1.0, self.scale + 0.02)
+
+class RateLimiter:
+    """
+    Process-wide, proactive rate limiter shared by all agents and tools.
+
+    Each key (e.g. "gemini:<model>", "maps", "openweather") has its own token buckets.
+    Keys of the form "name:variant" fall back to the limits configured for "name".
+    Callers queue per key in priority order. acquire() blocks the calling thread,
+    while acquire_async() awaits without blocking the event loop.
+    """
+    def __init__(self, limits=RATE_LIMITS, enabled=RATE_LIMITER_ENABLED):
+        self.enabled = enabled
+        self.config = dict(limits)
+        self.limits = {}
+        self.waiters = {} # key -> heap of (priority, seq)
+        self.seq = itertools.count()
+        self.cond = threading.Condition()
+
+    def _limit(self, key):
+        limit = self.limits.get(key)
+        if limit is None:
+            rpm, tpm = self.config.get(key) or self.config.get(key.split(":")[0]) or (0, 0)
+            limit = _Limit(rpm, tpm)
+            self.limits[key] = limit
+        return limit
+
+    def _attempt(self, key, entry, tokens):
+        """Called with the lock held. Returns 0 once quota is taken, else seconds to wait."""
+        heap = self.waiters[key]
+        if heap[0] != entry:
+            return 0.05 # Someone with higher priority (or earlier) is ahead
+        wait = self._limit(key).reserve(tokens, time.monotonic())
+        if wait == 0:
+            heapq.heappop(heap)
+            self.cond.notify_all()
+        return wait
+
+    def _enqueue(self, key, priority):
+        entry = (priority, next(self.seq))
+        heapq.heappush(self.waiters.setdefault(key, []), entry)
+        return entry
+
+    def _dequeue(self, key, entry):
+        heap = self.waiters.get(key, [])
+        if entry in heap:
+            heap.remove(entry)
+            heapq.heapify(heap)
+            self.cond.notify_all()
+
+    def acquire(self, key, tokens=0, priority=PRIORITY_NORMAL, timeout=None):
+        """
+        Blocks until a request for `key` (costing `tokens` for TPM limits) may proceed.
+        Returns False if timeout expired first.
+        """
+        if not self.enabled:
+            return True
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self.cond:
+            entry = self._enqueue(key, priority)
+            while True:
+                wait = self._attempt(key, entry, tokens)
+                if wait == 0:
+                    return True
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._dequeue(key, entry)
+                        return False
+                    wait = min(wait, remaining)
+                self.cond.wait(wait)
+
+    async def acquire_async(self, key, tokens=0, priority=PRIORITY_NORMAL, timeout=None):
+        """Async variant of acquire(); waits with asyncio.sleep instead of blocking the thread."""
+        if not self.enabled:
+            return True
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self.cond:
+            entry = self._enqueue(key, priority)
+        try:
+            while True:
+                with self.cond:
+                    wait = self._attempt(key, entry, tokens)
+                if wait == 0:
+                    entry = None
+                    return True
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                await asyncio.sleep(min(wait, 0.25))
+        finally:
+            if entry is not None:
+                with self.cond:
+                    self._dequeue(key, entry)
+
+    def penalize(self, key, retry_after):
+        """Blocks `key` for everyone until the retry hint passes and slows its rate down."""
+        with self.cond:
+            self._limit(key).penalize(retry_after, time.monotonic())
+            self.cond.notify_all()
+
+    def record_success(self, key):
+        if not self.enabled:
+            return
+        with self.cond:
+            self._limit(key).record_success()
+
+    def stats(self):
+        with self.cond:
+            now = time.monotonic()
+            return {
+                key: {
+                    "rpm": limit.rpm,
+                    "tpm": limit.tpm,
+                    "scale": round(limit.scale, 3),
+                    "blocked_for": max(0.0, limit.blocked_until - now),
+                    "waiting": len(self.waiters.get(key, []))
+                }
+                for key, limit in self.limits.items()
+            }
+
+# Process-wide limiter shared by all agents and tools
+limiter = RateLimiter()
+
+def handle_rate_limit(e, key=None):
     """
     Checks if the exception is a rate limit error (429).
-    If so, parses the retry delay and sleeps.
-    Returns True if it was a rate limit error and we slept, False otherwise.
+    If so, parses the retry delay and backs off.
+
+    With a limiter key, the delay is applied to the shared limiter so every caller of that
+    API backs off together, and the next limiter.acquire() does the waiting. Without a key
+    (or with the limiter disabled), this thread sleeps as before.
+    Returns True if it was a rate limit error (caller should retry), False otherwise.
     """
     error_str = str(e)
     if "429" in error_str or "quota" in error_str.lower():
         wait_time = 5.0 # Default fallback
-        
+
         # Pattern 1: "Please retry in 37.912305187s."
         match1 = re.search(r"Please retry in ([0-9.]+)\s*s", error_str)
         if match1:
             wait_time = float(match1.group(1))
-            
+
         # Pattern 2: "retry_delay { seconds: 37 }"
         if not match1:
             match2 = re.search(r"retry_delay\s*{\s*seconds:\s*([0-9]+)", error_str)
@@ -25,8 +237,14 @@ def handle_rate_limit(e):
 
         # Add a small buffer to be safe
         sleep_time = wait_time + 1.5
-        print(f"[Rate Limit] Quota exceeded. Sleeping for {sleep_time:.2f}s...")
-        time.sleep(sleep_time)
+        RATE_LIMIT_RETRIES.inc()
+        RATE_LIMIT_SLEEP_SECONDS.inc(sleep_time)
+        if key and limiter.enabled:
+            print(f"[Rate Limit] Quota exceeded for {key}. Backing off all callers for {sleep_time:.2f}s...")
+            limiter.penalize(key, sleep_time)
+        else:
+            print(f"[Rate Limit] Quota exceeded. Sleeping for {sleep_time:.2f}s...")
+            time.sleep(sleep_time)
         return True
-    
+
     return False
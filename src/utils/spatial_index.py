@@ -0,0 +1,89 @@
+import math
+
+EARTH_RADIUS_M = 6371000.0
+METERS_PER_DEGREE_LAT = 111320.0
+
+def haversine_m(coord1, coord2):
+    """
+    Great-circle distance in meters between two [lat, lon] points.
+    """
+    lat1, lon1 = math.radians(coord1[0]), math.radians(coord1[1])
+    lat2, lon2 = math.radians(coord2[0]), math.radians(coord2[1])
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+class SpatialIndex:
+    """
+    Lat/lon grid index bucketed by a category key (e.g. incident type).
+
+    Items are stored in fixed-size degree cells so a radius query only has to
+    look at the handful of cells around the query point instead of every item.
+    """
+    def __init__(self, cell_size_deg=0.01):
+        self.cell_size_deg = cell_size_deg
+        self.lon_cells = int(round(360.0 / cell_size_deg))
+        self.buckets = {} # (category, lat_cell, lon_cell) -> list of (coords, item)
+        self.size = 0
+
+    def _cell(self, coords):
+        lat_cell = int(math.floor(coords[0] / self.cell_size_deg))
+        lon_cell = int(math.floor(coords[1] / self.cell_size_deg)) % self.lon_cells
+        return lat_cell, lon_cell
+
+    def insert(self, category, coords, item):
+        lat_cell, lon_cell = self._cell(coords)
+        self.buckets.setdefault((category, lat_cell, lon_cell), []).append((coords, item))
+        self.size += 1
+
+    def remove(self, category, coords, item):
+        """Removes an item previously inserted with the same category and coords."""
+        lat_cell, lon_cell = self._cell(coords)
+        key = (category, lat_cell, lon_cell)
+        bucket = self.buckets.get(key)
+        if not bucket:
+            return False
+        for i, (_, existing) in enumerate(bucket):
+            if existing is item:
+                bucket.pop(i)
+                self.size -= 1
+                if not bucket:
+                    del self.buckets[key]
+                return True
+        return False
+
+    def clear(self):
+        self.buckets.clear()
+        self.size = 0
+
+    def query(self, category, coords, radius_m):
+        """
+        Returns a list of (distance_m, item) within radius_m of coords, nearest first.
+        """
+        lat_cell, lon_cell = self._cell(coords)
+        lat_span = int(math.ceil(radius_m / METERS_PER_DEGREE_LAT / self.cell_size_deg))
+
+        # Longitude degrees shrink towards the poles, so widen the search accordingly
+        cos_lat = math.cos(math.radians(min(89.9, abs(coords[0]) + lat_span * self.cell_size_deg)))
+        lon_span = int(math.ceil(radius_m / (METERS_PER_DEGREE_LAT * cos_lat) / self.cell_size_deg))
+        lon_span = min(lon_span, self.lon_cells // 2)
+
+        lon_range = {(lon_cell + d) % self.lon_cells for d in range(-lon_span, lon_span + 1)}
+
+        matches = []
+        for dlat in range(-lat_span, lat_span + 1):
+            for lon in lon_range:
+                bucket = self.buckets.get((category, lat_cell + dlat, lon))
+                if not bucket:
+                    continue
+                for item_coords, item in bucket:
+                    dist = haversine_m(coords, item_coords)
+                    if dist <= radius_m:
+                        matches.append((dist, item))
+
+        matches.sort(key=lambda m: m[0])
+        return matches
+
+    def __len__(self):
+        return self.size
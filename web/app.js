@@ -11,7 +11,8 @@ let state = {
     incidentCount: 0,
     simulationSpeed: 5000,
     markers: {},
-    isProcessing: false
+    isProcessing: false,
+    streamConnected: false
 };
 
 // --- 2. UI CONTROLLER ---
@@ -20,6 +21,7 @@ document.addEventListener('DOMContentLoaded', () => {
     setupListeners();
     fetchStatus();
     fetchIncidents(); // Load persisted data on startup
+    connectEventStream(); // Live updates pushed by the server
 });
 
 let map;
@@ -99,8 +101,8 @@ async function runSimulationStep() {
                 addIntelCard(data.raw_data.source, data.raw_data.timestamp, data.raw_data.text, data.incident);
             }
 
-            // B. Process Logs (Timeline)
-            if (data.logs) {
+            // B. Process Logs (Timeline) - the event stream delivers them when connected
+            if (data.logs && !state.streamConnected) {
                 processAgentLogs(data.logs, data.incident);
             }
 
@@ -108,7 +110,7 @@ async function runSimulationStep() {
             if (data.incident) {
                 addMapMarker(data.incident);
                 addVerifiedItem(data.incident);
-                updateStats();
+                if (!state.streamConnected) updateStats();
             }
 
         } else if (data.status === 'complete') {
@@ -280,6 +282,16 @@ function addMapMarker(incident) {
     map.flyTo(incident.coordinates, 10, { duration: 1.5 });
 }
 
+function removeIncident(id) {
+    // Archived incidents leave the live picture
+    const item = document.getElementById(`inc-${id}`);
+    if (item) item.remove();
+    if (state.markers[id]) {
+        map.removeLayer(state.markers[id]);
+        delete state.markers[id];
+    }
+}
+
 function logConsole(level, msg) {
     const consoleDiv = document.getElementById('console-logs');
     const line = document.createElement('div');
@@ -300,6 +312,41 @@ function logConsole(level, msg) {
     consoleDiv.prepend(line);
 }
 
+// --- 4. LIVE EVENT STREAM ---
+function connectEventStream() {
+    if (!window.EventSource) return; // Fall back to polling
+
+    const source = new EventSource(`${config.apiUrl}/events`);
+
+    source.onopen = () => {
+        // Catch up on anything missed while disconnected
+        if (!state.streamConnected) fetchIncidents();
+        state.streamConnected = true;
+    };
+    source.onerror = () => {
+        // EventSource reconnects on its own; poll until it does
+        state.streamConnected = false;
+    };
+
+    const onIncident = (e) => {
+        const incident = JSON.parse(e.data);
+        addMapMarker(incident);
+        addVerifiedItem(incident);
+    };
+    source.addEventListener('created', onIncident);
+    source.addEventListener('merged', onIncident);
+    source.addEventListener('archived', (e) => removeIncident(JSON.parse(e.data).id));
+
+    source.addEventListener('log', (e) => {
+        const data = JSON.parse(e.data);
+        processAgentLogs(data.lines, null);
+    });
+
+    // Server dropped events for this client, or memory was reset: reload the snapshot
+    source.addEventListener('resync', () => fetchIncidents());
+    source.addEventListener('reset', () => fetchIncidents());
+}
+
 async function fetchStatus() {
     try {
         const res = await fetch(`${config.apiUrl}/status`);
@@ -314,8 +361,16 @@ async function fetchStatus() {
 
 async function fetchIncidents() {
     try {
-        const res = await fetch(`${config.apiUrl}/incidents`);
-        const incidents = await res.json();
+        // Page through the full snapshot (reports are omitted by default)
+        const incidents = [];
+        let cursor = 0;
+        while (true) {
+            const res = await fetch(`${config.apiUrl}/incidents?since=${cursor}&limit=500`);
+            const page = await res.json();
+            incidents.push(...page.incidents);
+            cursor = page.next_cursor;
+            if (!page.has_more) break;
+        }
 
         // 1. Add/Update existing
         incidents.forEach(incident => {
@@ -323,7 +378,7 @@ async function fetchIncidents() {
             addVerifiedItem(incident);
         });
 
-        // 2. Remove stale items (Clean up duplicates or merged items)
+        // 2. Remove stale items (Clean up duplicates, merged or archived items)
         const validIds = new Set(incidents.map(i => `inc-${i.id}`));
         const list = document.getElementById('verified-list');
         Array.from(list.children).forEach(child => {
@@ -331,6 +386,9 @@ async function fetchIncidents() {
                 child.remove();
             }
         });
+        Object.keys(state.markers).forEach(id => {
+            if (!validIds.has(`inc-${id}`)) removeIncident(id);
+        });
 
         // 3. Sync Counters
         const count = incidents.length;